@@ -0,0 +1,64 @@
+"""
+Benchmark do motor de sumário (summary_engine) em grids com milhões de
+leituras
+
+Uso: python bench/bench_summary.py [--sheets 4] [--rows 2000] [--tubes 600]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from inspection import SheetGrid  # noqa: E402
+from summary_engine import summarize_sheets  # noqa: E402
+
+
+def make_grid(name, rows, tubes, seed):
+    rng = np.random.default_rng(seed)
+    values = rng.uniform(2.0, 9.0, size=(rows, tubes))
+    values[rng.random(size=values.shape) < 0.01] = np.nan
+    elevations = np.round(np.arange(rows) * 0.05, 3)
+    return SheetGrid(name, elevations, tuple(str(t) for t in range(1, tubes + 1)), values)
+
+
+def best_of(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--tubes", type=int, default=600)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    grids = [make_grid(f"Wall {i}", args.rows, args.tubes, i) for i in range(args.sheets)]
+    total = args.sheets * args.rows * args.tubes
+    print(f"{args.sheets} componentes, {total:,} leituras")
+
+    for per_tube in (True, False):
+        for parallel in (False, True):
+            elapsed = best_of(
+                lambda: summarize_sheets(grids, args.k, per_tube, parallel=parallel),
+                args.repeat,
+            )
+            print(
+                f"per_tube={per_tube!s:5} parallel={parallel!s:5} "
+                f"{elapsed * 1000:8.1f} ms  ({total / elapsed / 1e6:.0f} M leituras/s)"
+            )
+
+
+if __name__ == "__main__":
+    main()
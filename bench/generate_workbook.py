@@ -0,0 +1,113 @@
+"""
+Gerador de arquivos de inspeção sintéticos (.xlsx) no mesmo formato dos
+arquivos reais: aba Summary, N abas de componentes (rótulos dos tubos + 3
+linhas de cabeçalho + elevação × leituras) e aba Photos opcional
+
+Uso: python bench/generate_workbook.py saida.xlsx [--sheets 4] [--rows 400] [--tubes 100] [--photos 200]
+"""
+
+import argparse
+import datetime
+import os
+
+import numpy as np
+from openpyxl import Workbook
+
+ELEVATION_STEP_M = 0.05
+
+
+def _component_rows(rng, tubes, rows, blank_ratio, text_ratio):
+    yield ["Elevation (m)"] + list(range(1, tubes + 1))
+    yield ["Unit"] + ["mm"] * tubes
+    yield ["Nominal"] + [6.0] * tubes
+    yield ["Notes"] + [None] * tubes
+
+    # Espessura de base por tubo + algumas regiões finas (corrosão)
+    values = rng.normal(6.0, 0.35, size=(rows, tubes)) + rng.normal(0, 0.3, size=(1, tubes))
+    for _ in range(max(1, rows * tubes // 20_000)):
+        r, c = rng.integers(rows), rng.integers(tubes)
+        size_r, size_c = rng.integers(3, 30), rng.integers(1, 6)
+        values[r:r + size_r, c:c + size_c] -= rng.uniform(1.0, 3.5)
+    values = np.round(values, 2)
+
+    blanks = rng.random(size=values.shape) < blank_ratio
+    texts = rng.random(size=values.shape) < text_ratio
+    for i in range(rows):
+        row = [round(i * ELEVATION_STEP_M, 3)] + values[i].tolist()
+        for j in np.flatnonzero(blanks[i]):
+            row[j + 1] = None
+        for j in np.flatnonzero(texts[i]):
+            # Leitura digitada como texto, com vírgula decimal
+            row[j + 1] = f"{values[i, j]:.2f}".replace(".", ",")
+        yield row
+
+
+def write_workbook(path, sheets=4, rows=400, tubes=100, photos=0, seed=0,
+                   blank_ratio=0.01, text_ratio=0.0):
+    """
+    Grava o arquivo sintético em `path` e retorna o caminho
+    """
+    rng = np.random.default_rng(seed)
+    workbook = Workbook(write_only=True)
+
+    summary = workbook.create_sheet("Summary")
+    summary.append(["Company", "ACME"])
+    summary.append(["Site", "Refinaria Sintética"])
+    summary.append(["Unit", "Caldeira 1"])
+    summary.append(["Date", datetime.datetime(2024, 5, 3)])
+
+    names = [f"Wall {i + 1}" for i in range(sheets)]
+    for name in names:
+        sheet = workbook.create_sheet(name)
+        for row in _component_rows(rng, tubes, rows, blank_ratio, text_ratio):
+            sheet.append(row)
+
+    if photos:
+        sheet = workbook.create_sheet("Photos")
+        sheet.append(["wall", "tube", "elevation_m", "path"])
+        for k in range(photos):
+            wall = names[k % len(names)] if names else "Wall 1"
+            tube = int(rng.integers(1, tubes + 1))
+            elevation = round(int(rng.integers(rows)) * ELEVATION_STEP_M, 3)
+            sheet.append([wall, tube, elevation, f"imgs/fotos/foto_{k:05d}.jpg"])
+
+    workbook.save(path)
+    return path
+
+
+def write_photo_folder(folder, walls, tubes, rows, count, seed=0):
+    """
+    Cria `count` arquivos vazios com nomes no padrão {WALL}_T{TUBO}_E{ELEV}.jpg
+    (só o nome importa para o índice) e retorna a lista de pontos
+    """
+    rng = np.random.default_rng(seed)
+    os.makedirs(folder, exist_ok=True)
+    points = []
+    for k in range(count):
+        wall = walls[k % len(walls)]
+        tube = str(int(rng.integers(1, tubes + 1)))
+        elevation = round(int(rng.integers(rows)) * ELEVATION_STEP_M, 3)
+        open(os.path.join(folder, f"{wall}_T{tube}_E{elevation:.2f}.jpg"), "wb").close()
+        points.append((wall, tube, elevation))
+    return points
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("path")
+    parser.add_argument("--sheets", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=400)
+    parser.add_argument("--tubes", type=int, default=100)
+    parser.add_argument("--photos", type=int, default=0)
+    parser.add_argument("--text-ratio", type=float, default=0.0,
+                        help="fração das leituras gravadas como texto com vírgula")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    write_workbook(args.path, args.sheets, args.rows, args.tubes, args.photos, args.seed,
+                   text_ratio=args.text_ratio)
+    print(f"{args.path}: {os.path.getsize(args.path) / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
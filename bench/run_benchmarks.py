@@ -0,0 +1,167 @@
+"""
+Benchmarks dos caminhos críticos (leitura do .xlsx, sumário, montagem do
+heatmap, regiões finas, aba Photos e índice da pasta de fotos) sobre
+arquivos sintéticos.
+O resultado vai para um JSON, que pode ser comparado com uma execução
+anterior para detectar regressões
+
+Uso: python bench/run_benchmarks.py [--size small|medium|large] [--out bench_results.json] [--compare anterior.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from generate_workbook import write_photo_folder, write_workbook  # noqa: E402
+from heatmap import build_heatmap_figure, figure_payload_size, heatmap_z  # noqa: E402
+from ingest import parse_workbook  # noqa: E402
+from photo_index import PhotoIndex, build_photo_map  # noqa: E402
+from regions import find_regions  # noqa: E402
+from summary_engine import summarize_sheets  # noqa: E402
+from unwrap import unwrap_grids  # noqa: E402
+
+# componentes, linhas (elevações), tubos, linhas da aba Photos, fotos na pasta
+SIZES = {
+    "small": dict(sheets=4, rows=400, tubes=100, photos=200, photo_files=500),
+    "medium": dict(sheets=6, rows=1000, tubes=300, photos=2000, photo_files=5000),
+    "large": dict(sheets=8, rows=2000, tubes=600, photos=10000, photo_files=20000),
+}
+
+LOOKUPS = 1000
+
+
+def measure(func, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return {"best_s": min(times), "median_s": statistics.median(times), "runs": times}
+
+
+def run(size, repeat, workdir):
+    params = SIZES[size]
+    path = write_workbook(
+        os.path.join(workdir, "inspecao.xlsx"),
+        params["sheets"], params["rows"], params["tubes"], params["photos"],
+        text_ratio=0.01,
+    )
+    with open(path, "rb") as file:
+        data = file.read()
+
+    inspection = parse_workbook(data, parallel=False)
+    grids = list(inspection.sheets.values())
+    grid = grids[0]
+    low, high = float(np.nanmin(grid.values)), float(np.nanmax(grid.values))
+
+    folder = os.path.join(workdir, "fotos")
+    points = write_photo_folder(
+        folder, inspection.sheet_names, params["tubes"], params["rows"], params["photo_files"]
+    )
+    index = PhotoIndex(folder)
+    index.scan()
+    rng = np.random.default_rng(1)
+    queries = [points[i] for i in rng.integers(len(points), size=LOOKUPS)]
+
+    # Caldeira inteira (todos os componentes lado a lado)
+    boiler = unwrap_grids(grids)
+
+    # z filtrado já no cache compartilhado (outra sessão no mesmo intervalo)
+    shared_z = heatmap_z(grid.values, low, high)
+
+    benchmarks = {
+        "parse_workbook_serial": lambda: parse_workbook(data, parallel=False),
+        "parse_workbook_parallel": lambda: parse_workbook(data, parallel=True),
+        "summary": lambda: summarize_sheets(grids, parallel=False),
+        "heatmap_build": lambda: build_heatmap_figure(
+            grid.values, grid.elevations, grid.tubes, low, high
+        ),
+        "heatmap_shared_z": lambda: build_heatmap_figure(
+            grid.values, grid.elevations, grid.tubes, low, high, z=shared_z
+        ),
+        "heatmap_payload": lambda: figure_payload_size(
+            build_heatmap_figure(grid.values, grid.elevations, grid.tubes, low, high)
+        ),
+        "thin_regions_boiler": lambda: find_regions(boiler.values),
+        "photo_map_build": lambda: build_photo_map(inspection.photos),
+        "photo_index_scan": lambda: PhotoIndex(folder).scan(),
+        f"photo_index_lookup_x{LOOKUPS}": lambda: [index.lookup(*q) for q in queries],
+    }
+
+    results = []
+    for name, func in benchmarks.items():
+        func()  # aquecimento (imports, pool de processos)
+        result = {"name": name, **measure(func, repeat)}
+        results.append(result)
+        print(f"{name:32} {result['best_s'] * 1000:10.1f} ms (mediana {result['median_s'] * 1000:.1f} ms)")
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "size": size,
+        "params": params,
+        "file_bytes": len(data),
+        "readings": int(sum(g.values.size for g in grids)),
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "results": results,
+    }
+
+
+def compare(current, previous, threshold):
+    """
+    Mostra a razão atual/anterior de cada benchmark; retorna os nomes que
+    ficaram mais lentos que `threshold`
+    """
+    before = {r["name"]: r["best_s"] for r in previous["results"]}
+    regressions = []
+    print(f"\nComparação com {previous.get('timestamp')} ({previous.get('size')}):")
+    for result in current["results"]:
+        if result["name"] not in before:
+            continue
+        ratio = result["best_s"] / before[result["name"]]
+        flag = "  <-- regressão" if ratio > threshold else ""
+        print(f"{result['name']:32} {ratio:6.2f}x{flag}")
+        if flag:
+            regressions.append(result["name"])
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", choices=SIZES, default="small")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--compare", help="JSON de uma execução anterior")
+    parser.add_argument("--threshold", type=float, default=1.25,
+                        help="razão atual/anterior acima da qual há regressão")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        current = run(args.size, args.repeat, workdir)
+
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(current, file, indent=2)
+    print(f"Resultados em {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as file:
+            previous = json.load(file)
+        if compare(current, previous, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+# type: ignore
+
+"""
+Script com os ajustes das leituras (redução em mm e em %) e as consultas
+feitas sobre as leituras ordenadas de cada componente
+
+Os ajustes são monotônicos (espessura × fator − mm), então contar quantas
+leituras ajustadas caem num intervalo equivale a buscar os limites
+correspondentes no array ordenado das leituras originais (O(log n))
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class Adjustment:
+    """
+    Ajuste aplicado às leituras: espessura × factor − reduction_mm
+    """
+
+    factor: float = 1.0
+    reduction_mm: float = 0.0
+
+    @classmethod
+    def from_session(cls, state):
+        """
+        Monta o ajuste a partir dos valores guardados no st.session_state
+        """
+        factor = (
+            1.0 - (state.reduction_percent / 100.0)
+            if state.reduction_percent_on and state.reduction_percent > 0
+            else 1.0
+        )
+        reduction_mm = (
+            float(state.reduction_mm)
+            if state.reduction_mm_on and state.reduction_mm > 0
+            else 0.0
+        )
+        return cls(float(factor), reduction_mm)
+
+    @property
+    def identity(self):
+        return self.factor == 1.0 and self.reduction_mm == 0.0
+
+    def apply(self, values):
+        """
+        Aplica o ajuste (retorna o próprio array quando não há ajuste)
+        """
+        if self.identity:
+            return values
+        adjusted = values * self.factor
+        if self.reduction_mm:
+            adjusted -= self.reduction_mm
+        return adjusted
+
+
+def _ascending(sorted_values, adjustment):
+    """
+    Leituras e ajuste equivalentes com fator positivo (leitura ajustada
+    crescente com a leitura original)
+    """
+    if adjustment.factor > 0:
+        return sorted_values, adjustment
+    # Redução acima de 100%: fator negativo inverte a ordem (caso raro,
+    # custa uma cópia invertida das leituras)
+    return -sorted_values[::-1], Adjustment(-adjustment.factor, adjustment.reduction_mm)
+
+
+def _boundary(raw, adjustment, bound, inclusive):
+    """
+    Primeiro índice de `raw` cuja leitura ajustada é >= bound
+    (`inclusive=True`) ou > bound (`inclusive=False`)
+    """
+    def passes(value):
+        adjusted = adjustment.apply(value)
+        return adjusted >= bound if inclusive else adjusted > bound
+
+    side = "left" if inclusive else "right"
+    target = (bound + adjustment.reduction_mm) / adjustment.factor
+    i = int(np.searchsorted(raw, target, side=side))
+
+    # Corrige arredondamentos do mapeamento inverso, saltando leituras repetidas
+    n = raw.size
+    while i > 0 and passes(raw[i - 1]):
+        i = int(np.searchsorted(raw, raw[i - 1], side="left"))
+    while i < n and not passes(raw[i]):
+        i = int(np.searchsorted(raw, raw[i], side="right"))
+    return i
+
+
+def count_in_range(sorted_values, adjustment, low=-np.inf, high=np.inf):
+    """
+    Quantidade de leituras ajustadas em [low, high]
+    """
+    n = sorted_values.size
+    if n == 0 or low > high:
+        return 0
+    if adjustment.factor == 0:
+        # Calculado como as leituras (mesmo tipo de float)
+        constant = adjustment.apply(sorted_values[:1])[0]
+        return n if low <= constant <= high else 0
+
+    raw, adjustment = _ascending(sorted_values, adjustment)
+    start = 0 if low == -np.inf else _boundary(raw, adjustment, low, inclusive=True)
+    stop = n if high == np.inf else _boundary(raw, adjustment, high, inclusive=False)
+    return max(stop - start, 0)
+
+
+def adjusted_extent(sorted_values, adjustment):
+    """
+    Menor e maior leitura ajustada (NaN se não houver leituras)
+    """
+    if sorted_values.size == 0:
+        return float("nan"), float("nan")
+    ends = adjustment.apply(sorted_values[[0, -1]])
+    # str() de um float32 dá o decimal mais curto que o representa (8.997 em
+    # vez de 8.996999740600586), que volta exatamente ao mesmo float32
+    return float(str(ends.min())), float(str(ends.max()))
@@ -10,9 +10,11 @@ from pathlib import Path
 import streamlit as st
 
 from auth import authenticate_user, load_config, save_config
-from email_smtp import email_reset_password
+from email_smtp import email_reset_password, mail_status
 from file_upload import handle_file_upload
-from summary import generate_summary
+from instrumentation import begin_rerun, finish_rerun, profiling_default, stage
+from profile_panel import render_profile_panel
+from summary import generate_summary, start_summary
 from visualization import create_heatmap
 
 # Configurações iniciais da página
@@ -22,6 +24,9 @@ st.set_page_config(
     page_icon="imgs/simbolo-integral.png",
 )
 
+# Medição das etapas do rerun (painel "Medir etapas do rerun" na sidebar)
+begin_rerun(st.session_state.get("profile_enabled", profiling_default()))
+
 # ====== LOGO (Logo.png na raiz do projeto) ======
 LOGO_PATH = Path(__file__).resolve().parent.parent / "Logo.png"
 
@@ -40,8 +45,10 @@ if st.button("[DEBUG] Rerun"):
     st.rerun()
 
 # Autenticação do usuário
-config = load_config()
-authenticator = authenticate_user(config)
+with stage("config_load"):
+    config = load_config()
+with stage("authentication"):
+    authenticator = authenticate_user(config)
 
 auth_status = st.session_state.get("authentication_status")
 
@@ -58,14 +65,18 @@ if auth_status is True:
     st.write(f"Bem-vindo **{name}** - {email}")
     authenticator.logout()
 
-    with st.sidebar:
-        uploaded_file, company, site, date, sheets = handle_file_upload()
+    with st.sidebar, stage("file_upload"):
+        inspection, company, site, date, sheets = handle_file_upload()
+
+    if inspection:
+        # Sumário em segundo plano, enquanto o mapa de calor é montado
+        start_summary(inspection, sheets)
 
-    if uploaded_file:
-        _ = create_heatmap(uploaded_file, sheets)
+        with stage("heatmap"):
+            _ = create_heatmap(inspection, sheets)
 
-        with st.expander("Sumário"):
-            generate_summary(uploaded_file, sheets)
+        with st.expander("Sumário"), stage("summary"):
+            generate_summary(inspection, sheets)
 
 elif auth_status is False:
     st.error("Usuário ou senha incorretos")
@@ -121,7 +132,8 @@ elif auth_status is False:
                 + email_parts[1]
             )
             st.success(f"Senha nova enviada para o e-mail {email_censored}")
-            email_reset_password(new_random_password)
+            # Envio em segundo plano: a página não espera o servidor SMTP
+            st.session_state.reset_email_job = email_reset_password(new_random_password)
         elif username_of_forgotten_password is False:
             st.error("Usuário não encontrado")
     except Exception as e:
@@ -180,11 +192,19 @@ elif auth_status is None:
                 + email_parts[1]
             )
             st.success(f"Senha nova enviada para o e-mail {email_censored}")
-            email_reset_password(new_random_password)
+            # Envio em segundo plano: a página não espera o servidor SMTP
+            st.session_state.reset_email_job = email_reset_password(new_random_password)
         elif username_of_forgotten_password is False:
             st.error("Usuário não encontrado")
     except Exception as e:
         st.error(e)
 
+# Situação do último e-mail de nova senha desta sessão
+if st.session_state.get("reset_email_job") and auth_status is not True:
+    st.caption(f"E-mail de nova senha: {mail_status(st.session_state.reset_email_job)}")
+
 # Atualiza os parâmetros de autenticação no arquivo config.yaml
-save_config(config)  # deve ser a última função chamada da aplicação
\ No newline at end of file
+with stage("config_save"):
+    save_config(config)  # deve ser a última função chamada da aplicação (o painel abaixo só exibe as medições)
+
+render_profile_panel(finish_rerun())
@@ -8,24 +8,27 @@ Streamlit Authenticator e um arquivo YAML com os parâmetros necessários
 
 import streamlit as st
 import streamlit_authenticator as stauth
-import yaml
 from streamlit_authenticator.utilities import LoginError
 
+from credential_store import get_credential_store
 
-def load_config(path="src/config.yaml"):
+CONFIG_PATH = "src/config.yaml"
+
+
+def load_config(path=CONFIG_PATH):
     """
     Carrega os parâmetros de autenticação a partir do arquivo YAML especificado
+    (em memória; o arquivo só é relido quando muda)
     """
-    with open(path, "r", encoding="utf-8") as file:
-        return yaml.safe_load(file)
+    return get_credential_store(path).load()
 
 
-def save_config(config, path="src/config.yaml"):
+def save_config(config, path=CONFIG_PATH):
     """
-    Salva os parâmetros de autenticação no arquivo YAML especificado
+    Salva os parâmetros de autenticação no arquivo YAML especificado, apenas
+    se a sessão alterou algo (gravação atômica, sob trava)
     """
-    with open(path, "w", encoding="utf-8") as file:
-        return yaml.safe_dump(config, file, default_flow_style=False)
+    return get_credential_store(path).save(config)
 
 
 def authenticate_user(config):
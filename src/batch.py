@@ -0,0 +1,243 @@
+# type: ignore
+
+"""
+Script para o processamento em lote (sem Streamlit) de uma pasta de
+arquivos de inspeção (.xlsx ou colunares: Parquet, Arrow IPC, CSV, .zip):
+sumário em JSON/CSV e heatmaps em HTML por arquivo, em paralelo no pool de
+processos
+
+Uso: python src/batch.py PASTA [--out saida] [--workers N] [--format json csv]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from dataclasses import asdict
+
+import numpy as np
+import pandas as pd
+from plotly.offline import get_plotlyjs
+
+from columnar import COLUMNAR_EXTENSIONS, is_columnar, map_file, parse_columnar
+from heatmap import build_heatmap_figure
+from ingest import parse_workbook
+from inspection import content_hash
+from lod import Pyramid
+from parallel import MAX_WORKERS, map_as_completed
+from summary_engine import min_readings_frame, summarize_sheets, summary_frame
+
+OUTPUT_DIR = "saida_lote"
+SUMMARY_JSON = "summary.json"
+# Hash do último arquivo processado e opções da execução (permite pular os
+# que não mudaram)
+HASH_FILE = ".hash"
+PLOTLY_JS = "plotly.min.js"
+BATCH_REPORT = "lote.csv"
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w\-]+", "_", str(name)).strip("_") or "componente"
+
+
+def _output_name(path):
+    # Pasta de saída do arquivo: nome com a extensão ("a.xlsx" → "a_xlsx"),
+    # para "a.xlsx" e "a.csv" não dividirem a mesma pasta
+    return _safe_name(os.path.basename(path))
+
+
+def _check_output_names(paths):
+    """
+    ValueError se dois arquivos caírem na mesma pasta de saída (ex.: "West
+    Wall.xlsx" e "West_Wall.xlsx"); comparação sem maiúsculas/minúsculas,
+    como nos sistemas de arquivos do Windows e do macOS
+    """
+    seen = {}
+    for path in paths:
+        seen.setdefault(_output_name(path).casefold(), []).append(os.path.basename(path))
+    clashes = [names for names in seen.values() if len(names) > 1]
+    if clashes:
+        detail = "; ".join(" / ".join(names) for names in clashes)
+        raise ValueError(f"Arquivos com a mesma pasta de saída (renomeie um deles): {detail}")
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+def _write_heatmaps(inspection, folder):
+    # Um HTML por componente; o plotly.js fica uma única vez na pasta de saída
+    for name, grid in inspection.sheets.items():
+        if grid.empty:
+            continue
+        values, elevations, tubes, _ = Pyramid(grid.values, grid.elevations, grid.tubes).view()
+        fig = build_heatmap_figure(values, elevations, tubes, -np.inf, np.inf)
+        fig.update_layout(title=f"{inspection.company} — {inspection.site} — {inspection.date} — {name}")
+        fig.write_html(
+            os.path.join(folder, f"{_safe_name(name)}.html"),
+            include_plotlyjs=f"../{PLOTLY_JS}",
+        )
+
+
+def _run_marker(digest, formats, html, k):
+    # Conteúdo do .hash: saídas de outras opções (--k, --format, --no-html)
+    # não contam como processadas
+    return json.dumps(
+        {"hash": digest, "formats": sorted(formats), "html": bool(html), "k": int(k)},
+        sort_keys=True,
+    )
+
+
+def _previous_marker(folder):
+    try:
+        with open(os.path.join(folder, HASH_FILE), encoding="utf-8") as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def process_file(args):
+    """
+    Tarefa do pool: processa um arquivo e retorna o registro do relatório
+    """
+    path, out_dir, formats, html, k, force = args
+    folder = os.path.join(out_dir, _output_name(path))
+    record = {"file": os.path.basename(path), "status": "ok"}
+    timings = {}
+
+    try:
+        start = time.perf_counter()
+        if is_columnar(path):
+            # Mapeado em memória: hash e leitura sobre o mesmo buffer
+            data = map_file(path)
+        else:
+            with open(path, "rb") as file:
+                data = file.read()
+        digest = content_hash(data)
+        marker = _run_marker(digest, formats, html, k)
+        if not force and _previous_marker(folder) == marker:
+            record.update(status="inalterado", hash=digest, seconds=0.0)
+            return record
+
+        if is_columnar(path):
+            inspection = parse_columnar(data, path, digest)
+        else:
+            # Os arquivos já são distribuídos entre processos: cada um em série
+            inspection = parse_workbook(data, digest, parallel=False)
+        timings["parse"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        summaries = summarize_sheets(inspection.sheets.values(), k, parallel=False)
+        timings["summary"] = time.perf_counter() - start
+
+        os.makedirs(folder, exist_ok=True)
+        start = time.perf_counter()
+        if html:
+            _write_heatmaps(inspection, folder)
+            timings["html"] = time.perf_counter() - start
+
+        valid = [s for s in summaries if s is not None]
+        minima = [r.thickness for s in valid for r in s.min_readings]
+        record.update(
+            hash=digest,
+            company=str(inspection.company),
+            site=str(inspection.site),
+            date=str(inspection.date),
+            sheets=len(inspection.sheets),
+            readings=sum(s.readings for s in valid),
+            min_thickness=min(minima) if minima else None,
+        )
+
+        start = time.perf_counter()
+        if "csv" in formats:
+            summary_frame(summaries).to_csv(os.path.join(folder, "summary.csv"), index=False)
+            min_readings_frame(summaries).to_csv(
+                os.path.join(folder, "min_readings.csv"), index=False
+            )
+        if "json" in formats:
+            payload = dict(record, sheet_summaries=[asdict(s) for s in valid])
+            with open(os.path.join(folder, SUMMARY_JSON), "w", encoding="utf-8") as file:
+                json.dump(payload, file, ensure_ascii=False, indent=2, default=_json_default)
+        timings["write"] = time.perf_counter() - start
+
+        # Gravado por último: marca o arquivo como processado
+        with open(os.path.join(folder, HASH_FILE), "w", encoding="utf-8") as file:
+            file.write(marker)
+    except Exception as e:  # noqa: BLE001 - um arquivo ruim não interrompe o lote
+        record.update(status="erro", error=f"{type(e).__name__}: {e}")
+
+    record["seconds"] = round(sum(timings.values()), 3)
+    return record
+
+
+def find_workbooks(folder):
+    """
+    Arquivos de inspeção da pasta (.xlsx e colunares; ignora os temporários
+    do Excel, "~$...")
+    """
+    return sorted(
+        os.path.join(folder, name) for name in os.listdir(folder)
+        if name.lower().endswith((".xlsx",) + COLUMNAR_EXTENSIONS) and not name.startswith("~$")
+    )
+
+
+def run_batch(folder, out_dir=OUTPUT_DIR, formats=("json", "csv"), html=True, k=3,
+              max_workers=None, force=False, log=print):
+    """
+    Processa todos os arquivos de inspeção da pasta; retorna o relatório (um registro por
+    arquivo, na ordem dos nomes). ValueError, antes de processar, se dois
+    arquivos forem para a mesma pasta de saída
+    """
+    paths = find_workbooks(folder)
+    _check_output_names(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    if html:
+        with open(os.path.join(out_dir, PLOTLY_JS), "w", encoding="utf-8") as file:
+            file.write(get_plotlyjs())
+
+    tasks = [(path, out_dir, tuple(formats), html, k, force) for path in paths]
+    records = [None] * len(tasks)
+    start = time.perf_counter()
+    for done, (i, record) in enumerate(
+        map_as_completed(process_file, tasks, max_workers, parallel=len(tasks) > 1), start=1
+    ):
+        records[i] = record
+        detail = record.get("error") or f"{record['seconds']:.2f} s"
+        log(f"[{done}/{len(tasks)}] {record['file']}: {record['status']} ({detail})")
+
+    report = pd.DataFrame(records)
+    report.to_csv(os.path.join(out_dir, BATCH_REPORT), index=False)
+    log(f"{len(tasks)} arquivos em {time.perf_counter() - start:.1f} s")
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Processa em lote uma pasta de arquivos de inspeção (.xlsx, Parquet, Arrow, CSV, .zip)"
+    )
+    parser.add_argument("folder", help="pasta com os arquivos de inspeção")
+    parser.add_argument("--out", default=OUTPUT_DIR, help="pasta de saída")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="processos em paralelo")
+    parser.add_argument("--format", nargs="+", choices=("json", "csv"), default=["json", "csv"])
+    parser.add_argument("--no-html", action="store_true", help="não gera os heatmaps")
+    parser.add_argument("--k", type=int, default=3, help="menores leituras por componente")
+    parser.add_argument("--force", action="store_true",
+                        help="reprocessa arquivos sem alteração desde a última execução")
+    args = parser.parse_args(argv)
+
+    try:
+        report = run_batch(
+            args.folder, args.out, args.format, not args.no_html, args.k, args.workers, args.force
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    failed = not report.empty and (report["status"] == "erro").any()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
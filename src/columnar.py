@@ -0,0 +1,208 @@
+# type: ignore
+
+"""
+Script para a leitura das inspeções em formato colunar (Parquet, Arrow IPC
+ou CSV) pelo pyarrow, sem objetos Python por célula
+
+Formatos aceitos:
+- um arquivo .parquet/.arrow/.feather/.csv: um componente (coluna de
+  elevação + uma coluna por tubo); empresa, refinaria, data e nome do
+  componente vêm dos metadados do schema (chaves company, site, date e
+  sheet), quando houver
+- um .zip com summary.* (company, site, date e, opcional, a lista sheets),
+  uma tabela por componente (nome = metadado "sheet" ou nome do arquivo) e,
+  opcional, photos.*; é o mesmo layout da biblioteca (data/inspecoes/{hash})
+
+Os bytes são lidos sem cópia (Arrow IPC aponta direto para o buffer do
+arquivo carregado ou mapeado em memória) e o CSV usa o leitor multithread
+do pyarrow
+"""
+
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from ingest import column_labels
+from inspection import Inspection, cached_inspection, content_hash
+from instrumentation import stage
+from library import table_to_sheet
+
+TABLE_EXTENSIONS = (".parquet", ".arrow", ".feather", ".ipc", ".csv")
+COLUMNAR_EXTENSIONS = TABLE_EXTENSIONS + (".zip",)
+
+SUMMARY_STEM = "summary"
+PHOTOS_STEM = "photos"
+
+# Número (ponto ou vírgula decimal, com espaços nas pontas); o resto vira NaN
+_NUMBER_PATTERN = r"^\s*[-+]?(\d+([.,]\d*)?|[.,]\d+)([eE][-+]?\d+)?\s*$"
+
+
+def is_columnar(name):
+    """
+    Indica se o arquivo (pelo nome) é lido por este módulo
+    """
+    return str(name).lower().endswith(COLUMNAR_EXTENSIONS)
+
+
+def map_file(path):
+    """
+    Conteúdo do arquivo mapeado em memória (sem cópia)
+    """
+    with pa.memory_map(path, "r") as source:
+        return source.read_buffer()
+
+
+def _csv_options(buffer):
+    # Separador ";" indica o padrão brasileiro (vírgula decimal)
+    first_line = buffer[:4096].to_pybytes().split(b"\n", 1)[0]
+    if first_line.count(b";") > first_line.count(b","):
+        return pa_csv.ParseOptions(delimiter=";"), pa_csv.ConvertOptions(decimal_point=",")
+    return pa_csv.ParseOptions(delimiter=","), pa_csv.ConvertOptions()
+
+
+def read_table(data, name):
+    """
+    Lê uma tabela (Parquet, Arrow IPC/Feather ou CSV, pela extensão de
+    `name`) de bytes ou de um buffer do pyarrow
+    """
+    buffer = data if isinstance(data, pa.Buffer) else pa.py_buffer(data)
+    extension = os.path.splitext(str(name).lower())[1]
+    if extension == ".parquet":
+        return pq.read_table(pa.BufferReader(buffer))
+    if extension == ".csv":
+        parse_options, convert_options = _csv_options(buffer)
+        return pa_csv.read_csv(
+            pa.BufferReader(buffer),
+            read_options=pa_csv.ReadOptions(use_threads=True),
+            parse_options=parse_options,
+            convert_options=convert_options,
+        )
+    if extension in (".arrow", ".feather", ".ipc"):
+        try:
+            return pa.ipc.open_file(buffer).read_all()
+        except pa.ArrowInvalid:
+            # Formato "stream" do Arrow IPC
+            return pa.ipc.open_stream(buffer).read_all()
+    raise ValueError(f"Formato não suportado: {name}")
+
+
+def _to_float(column, dtype):
+    """
+    Coluna numérica do tipo `dtype`; textos que não são números viram NaN
+    """
+    if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+        numeric = pc.match_substring_regex(column, _NUMBER_PATTERN)
+        text = pc.replace_substring(pc.utf8_trim_whitespace(column), ",", ".")
+        column = pc.if_else(numeric, text, pa.scalar(None, column.type))
+    elif not (pa.types.is_floating(column.type) or pa.types.is_integer(column.type)
+              or pa.types.is_null(column.type)):
+        return pa.chunked_array([np.full(len(column), np.nan, dtype=dtype)])
+    column = pc.cast(column, pa.from_numpy_dtype(dtype))
+    return pc.fill_null(column, np.nan).combine_chunks()
+
+
+def grid_from_table(table, name=None):
+    """
+    Grid do componente a partir da tabela (1ª coluna = elevação, depois uma
+    coluna por tubo); linhas sem elevação válida são descartadas
+    """
+    labels = column_labels(table.column_names)
+    columns = [_to_float(table.column(0), np.float64)] if labels else []
+    columns += [_to_float(table.column(j), np.float32) for j in range(1, len(labels))]
+    numeric = pa.Table.from_arrays(columns, names=labels).replace_schema_metadata(
+        table.schema.metadata
+    )
+    if labels:
+        numeric = numeric.filter(pc.invert(pc.is_nan(numeric.column(0))))
+    return table_to_sheet(numeric, name)
+
+
+def _metadata(table):
+    metadata = table.schema.metadata or {}
+    return {key.decode("utf-8"): value.decode("utf-8") for key, value in metadata.items()}
+
+
+def _to_date(value):
+    if value is None or value == "":
+        return None
+    return pd.to_datetime(value).date()
+
+
+def _parse_table(data, name, digest):
+    table = read_table(data, name)
+    meta = _metadata(table)
+    sheet = meta.get("sheet") or os.path.splitext(os.path.basename(name))[0]
+    with stage(f"parse:{sheet}"):
+        grid = grid_from_table(table, sheet)
+    return Inspection(
+        digest, meta.get("company"), meta.get("site"), _to_date(meta.get("date")),
+        {sheet: grid}, None,
+    )
+
+
+def _parse_zip(data, digest):
+    buffer = data if isinstance(data, pa.Buffer) else pa.py_buffer(data)
+    with zipfile.ZipFile(pa.BufferReader(buffer)) as archive:
+        members = [
+            info.filename for info in archive.infolist()
+            if not info.is_dir() and info.filename.lower().endswith(TABLE_EXTENSIONS)
+        ]
+
+        summary = photos = None
+        tables = []
+        for member in members:
+            stem = os.path.splitext(os.path.basename(member))[0].lower()
+            table = read_table(archive.read(member), member)
+            if stem == SUMMARY_STEM:
+                summary = table.to_pylist()[0] if table.num_rows else {}
+            elif stem == PHOTOS_STEM:
+                photos = table.to_pandas()
+            else:
+                tables.append((member, table))
+
+    if summary is None:
+        raise ValueError(f"Arquivo .zip sem a tabela {SUMMARY_STEM} (company, site, date)")
+
+    sheets = {}
+    for member, table in tables:
+        name = _metadata(table).get("sheet") or os.path.splitext(os.path.basename(member))[0]
+        with stage(f"parse:{name}"):
+            sheets[name] = grid_from_table(table, name)
+
+    # A ordem da lista "sheets" do summary, quando houver
+    order = [name for name in summary.get("sheets") or [] if name in sheets]
+    sheets = {name: sheets[name] for name in order + [n for n in sheets if n not in order]}
+
+    date = summary.get("date")
+    return Inspection(
+        digest, summary.get("company"), summary.get("site"),
+        date if date is None or hasattr(date, "year") else _to_date(date),
+        sheets, photos,
+    )
+
+
+def parse_columnar(data, name, digest=None):
+    """
+    Lê a inspeção de um arquivo colunar (ou .zip com o layout da
+    biblioteca); `data` pode ser bytes ou um buffer do pyarrow
+    """
+    digest = digest or content_hash(data)
+    if str(name).lower().endswith(".zip"):
+        return _parse_zip(data, digest)
+    return _parse_table(data, name, digest)
+
+
+def load_columnar(uploaded_file):
+    """
+    Como `ingest.load_inspection`, para os arquivos colunares
+    """
+    data = uploaded_file.getvalue()
+    with stage("content_hash"):
+        key = content_hash(data)
+    return cached_inspection(key, lambda: parse_columnar(data, uploaded_file.name, key))
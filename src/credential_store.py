@@ -0,0 +1,161 @@
+# type: ignore
+
+"""
+Script com o armazenamento dos parâmetros de autenticação (config.yaml)
+compartilhado entre as sessões
+
+O arquivo é lido uma vez e mantido em memória; só é relido quando o mtime
+(ou o tamanho) muda. A gravação acontece apenas quando a sessão alterou
+alguma coisa: as alterações (em relação à versão que a sessão leu) são
+aplicadas sobre a versão mais recente do disco, sob trava de arquivo, e
+gravadas em um arquivo temporário que substitui o original (os.replace)
+"""
+
+import copy
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import yaml
+from cachetools import LRUCache
+
+try:
+    import fcntl
+except ImportError:  # Windows: só a trava entre threads
+    fcntl = None
+
+# Sessões cujas configurações lidas ficam guardadas para a comparação
+_BASELINES_SIZE = 256
+
+_MISSING = object()
+
+
+def _three_way(base, mine, theirs):
+    """
+    Junta as alterações da sessão (base → mine) à versão atual (theirs)
+    """
+    if not (isinstance(base, dict) and isinstance(mine, dict) and isinstance(theirs, dict)):
+        return theirs if mine == base else mine
+
+    result = dict(theirs)
+    for key in set(base) | set(mine):
+        old = base.get(key, _MISSING)
+        new = mine.get(key, _MISSING)
+        if new == old:
+            continue
+        if new is _MISSING:
+            # Removido pela sessão (só se ninguém mais alterou)
+            if theirs.get(key, _MISSING) == old:
+                result.pop(key, None)
+        elif old is _MISSING or key not in theirs:
+            result[key] = new
+        else:
+            result[key] = _three_way(old, new, theirs[key])
+    return result
+
+
+class CredentialStore:
+    """
+    config.yaml em memória, com gravação atômica e só quando há mudança
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._signature = None
+        self._config = None
+        self._baselines = LRUCache(maxsize=_BASELINES_SIZE)
+        self.writes = 0
+
+    def _stat_signature(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def _read(self):
+        # Chamado com self._lock
+        signature = self._stat_signature()
+        if signature != self._signature:
+            with open(self.path, "r", encoding="utf-8") as file:
+                self._config = yaml.safe_load(file) or {}
+            self._signature = signature
+        return self._config
+
+    @contextmanager
+    def _file_lock(self):
+        if fcntl is None:
+            yield
+            return
+        # Trava em arquivo separado: o config.yaml é substituído a cada gravação
+        with open(self.path + ".lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def load(self):
+        """
+        Cópia da configuração para a sessão (relê o arquivo só se mudou)
+        """
+        with self._lock:
+            config = copy.deepcopy(self._read())
+            # A cópia fica guardada junto com a versão lida (evita reuso do id)
+            self._baselines[id(config)] = (config, copy.deepcopy(config))
+        return config
+
+    def save(self, config):
+        """
+        Grava as alterações da sessão; retorna False se não havia nenhuma
+        """
+        with self._lock:
+            entry = self._baselines.get(id(config))
+            if entry is not None and entry[0] is config:
+                base = entry[1]
+            else:
+                base = self._read()
+            if config == base:
+                return False
+
+            with self._file_lock():
+                latest = self._read()
+                merged = _three_way(base, config, latest)
+                if merged != latest:
+                    self._write(merged)
+            self._baselines[id(config)] = (config, copy.deepcopy(config))
+            return True
+
+    def _write(self, config):
+        # Chamado com self._lock e a trava do arquivo
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(prefix=".config-", suffix=".yaml", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as file:
+                yaml.safe_dump(config, file, default_flow_style=False)
+                file.flush()
+                os.fsync(file.fileno())
+            if os.path.exists(self.path):
+                os.chmod(tmp, os.stat(self.path).st_mode & 0o777)
+            os.replace(tmp, self.path)
+        except BaseException:
+            os.remove(tmp)
+            raise
+        self._config = copy.deepcopy(config)
+        self._signature = self._stat_signature()
+        self.writes += 1
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_credential_store(path):
+    """
+    Armazenamento do arquivo (um por caminho, compartilhado pelo processo)
+    """
+    path = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = _stores[path] = CredentialStore(path)
+        return store
@@ -1,13 +1,172 @@
 # src/email_smtp.py
 # type: ignore
+
+"""
+Script para o envio dos e-mails (nova senha) em segundo plano
+
+Os e-mails entram em uma fila atendida por uma thread, que reaproveita a
+conexão SMTP entre envios (fechada após um tempo ociosa) e tenta de novo,
+com espera exponencial, quando o servidor falha. A página não espera o
+envio: a situação de cada e-mail é consultada por `mail_status`
+"""
+
+import itertools
+import os
+import queue
 import smtplib
+import threading
 from email.message import EmailMessage
 
+from cachetools import LRUCache
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+)
+
 # from email.mime.multipart import MIMEMultipart
 # from email.mime.text import MIMEText
 
+SMTP_HOST = os.environ.get("CALDEIRA_SMTP_HOST", "localhost")
+SMTP_PORT = int(os.environ.get("CALDEIRA_SMTP_PORT", "8025"))
+SMTP_TIMEOUT = 10
+
+# Conexão fechada após este tempo sem e-mails (s)
+SMTP_IDLE_SECONDS = 60
+
+MAX_ATTEMPTS = 4
+
+STATUS_QUEUED = "na fila"
+STATUS_SENDING = "enviando"
+STATUS_SENT = "enviado"
+STATUS_FAILED = "falhou"
+
+
+class MailQueue:
+    """
+    Fila de e-mails atendida por uma thread, com conexão reaproveitada
+    """
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, idle_seconds=SMTP_IDLE_SECONDS,
+                 max_attempts=MAX_ATTEMPTS, wait=None):
+        self.host = host
+        self.port = port
+        self.idle_seconds = idle_seconds
+        self._queue = queue.Queue()
+        self._server = None
+        self._status = LRUCache(maxsize=1024)
+        self._status_lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+        self._send_with_retry = retry(
+            stop=stop_after_attempt(max_attempts),
+            wait=wait or wait_exponential(multiplier=1, max=30),
+            retry=retry_if_exception_type((smtplib.SMTPException, OSError)),
+            before_sleep=self._before_retry,
+            reraise=True,
+        )(self._send)
+
+    def submit(self, msg):
+        """
+        Coloca o e-mail na fila e retorna o identificador do envio
+        """
+        job_id = next(self._ids)
+        self._set_status(job_id, STATUS_QUEUED)
+        self._queue.put((job_id, msg))
+        self._ensure_worker()
+        return job_id
+
+    def status(self, job_id):
+        with self._status_lock:
+            return self._status.get(job_id)
+
+    def join(self):
+        """
+        Espera a fila esvaziar
+        """
+        self._queue.join()
+
+    def _set_status(self, job_id, status):
+        with self._status_lock:
+            self._status[job_id] = status
+
+    def _ensure_worker(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="email", daemon=True)
+                self._thread.start()
+
+    def _connect(self):
+        if self._server is None:
+            self._server = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT)
+        return self._server
+
+    def _disconnect(self):
+        server, self._server = self._server, None
+        if server is not None:
+            try:
+                server.quit()
+            except (smtplib.SMTPException, OSError):
+                server.close()
+
+    def _send(self, job_id, msg):
+        self._set_status(job_id, STATUS_SENDING)
+        self._connect().send_message(msg)
+
+    def _before_retry(self, retry_state):
+        # Conexão possivelmente quebrada: a próxima tentativa abre outra
+        self._disconnect()
+        job_id = retry_state.args[0]
+        self._set_status(job_id, f"nova tentativa ({retry_state.attempt_number + 1})")
+
+    def _run(self):
+        while True:
+            try:
+                job_id, msg = self._queue.get(timeout=self.idle_seconds)
+            except queue.Empty:
+                self._disconnect()
+                continue
+            try:
+                self._send_with_retry(job_id, msg)
+                self._set_status(job_id, STATUS_SENT)
+            except Exception as e:  # noqa: BLE001 - a thread da fila não pode morrer
+                self._disconnect()
+                self._set_status(job_id, f"{STATUS_FAILED}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_mail_queue = None
+_mail_queue_lock = threading.Lock()
+
+
+def get_mail_queue():
+    """
+    Fila de e-mails do processo (criada no primeiro uso)
+    """
+    global _mail_queue
+    with _mail_queue_lock:
+        if _mail_queue is None:
+            _mail_queue = MailQueue()
+        return _mail_queue
+
+
+def mail_status(job_id):
+    """
+    Situação do envio: na fila, enviando, nova tentativa (n), enviado ou
+    falhou: motivo
+    """
+    return get_mail_queue().status(job_id)
+
 
 def email_reset_password(password):
+    """
+    Coloca na fila o e-mail com a nova senha e retorna o identificador do
+    envio (não espera o servidor SMTP)
+    """
     from_addr = "email@exemplo.com"
     to_addr = "email@exemplo.com"
     subject = "Assunto do Email"
@@ -23,6 +182,4 @@ A sua nova senha é {password}
 
     # msg.attach(MIMEText(body, "plain"))
 
-    server = smtplib.SMTP("localhost", 8025)
-    server.send_message(msg)
-    server.quit()
+    return get_mail_queue().submit(msg)
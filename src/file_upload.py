@@ -5,27 +5,58 @@
 Script para lidar com o carregamento dos dados a partir do arquivo de inspeção
 """
 
-import pandas as pd
 import streamlit as st
 
+from columnar import COLUMNAR_EXTENSIONS, is_columnar, load_columnar
+from ingest import load_inspection
+from inspection import InspectionHandle
+from instrumentation import stage
+from library import list_inspections, open_inspection, store_inspection
+
+# .xlsx ou formato colunar (Parquet, Arrow IPC, CSV ou .zip com o layout da biblioteca)
+UPLOAD_TYPES = ["xlsx"] + [extension.lstrip(".") for extension in COLUMNAR_EXTENSIONS]
+
 
 def handle_file_upload():
     """
     Lida com o arquivo carregado e trata seus dados
     """
-    uploaded_file = st.file_uploader("Escolha um arquivo .xlsx", type=".xlsx")
+    uploaded_file = st.file_uploader("Escolha um arquivo de inspeção", type=UPLOAD_TYPES)
+
+    inspection = None
     if uploaded_file:
-        summary = pd.read_excel(uploaded_file, "Summary", header=None)
-        date = pd.to_datetime(summary.iloc[3, 1]).date()
-        company = summary.iloc[0, 1]
-        site = summary.iloc[1, 1]
-        sheets = pd.ExcelFile(uploaded_file).sheet_names
-        sheets = [sheet for sheet in sheets if sheet != "Summary"]
+        loader = load_columnar if is_columnar(uploaded_file.name) else load_inspection
+        with stage("load_inspection"):
+            inspection = loader(uploaded_file)
+        with stage("store_inspection"):
+            store_inspection(inspection, uploaded_file.name)
+    else:
+        entries = list_inspections()
+        if entries:
+            entry = st.selectbox(
+                "Inspeções anteriores:",
+                [None] + entries,
+                format_func=lambda e: "—" if e is None else e.label(),
+            )
+            if entry is not None:
+                with stage("open_inspection"):
+                    inspection = open_inspection(entry.hash)
+
+    if inspection:
+        # Mantém a inspeção no cache enquanto esta sessão a usa
+        handle = st.session_state.get("inspection_handle")
+        if handle is None or handle.inspection.hash != inspection.hash:
+            st.session_state.inspection_handle = InspectionHandle(inspection)
+
+        date = inspection.date
+        company = inspection.company
+        site = inspection.site
+        sheets = inspection.sheet_names
         st.text_input("Empresa:", value=company, disabled=True)
         st.text_input("Refinaria:", value=site, disabled=True)
         st.text_input("Data:", value=date, disabled=True)
 
-        return uploaded_file, company, site, date, sheets
+        return inspection, company, site, date, sheets
     else:
         st.warning("Insira um arquivo para visualização")
         return None, None, None, None, None
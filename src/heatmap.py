@@ -0,0 +1,192 @@
+# type: ignore
+
+"""
+Script para a montagem do heatmap (sem dependência do Streamlit)
+
+Um único trace: as leituras vão como array float32 (serializado em binário
+pelo Plotly) e as células ≤ 0 mm ficam pretas pela própria escala de cores,
+mantendo o tooltip com o valor real
+"""
+
+import numpy as np
+import plotly.graph_objects as go
+import plotly.io as pio
+from cachetools import LRUCache
+
+# ======== ESCALA DE CORES FIXA ========
+FIX_MIN = 2.5
+FIX_MAX = 9.0
+
+# Tamanhos de payload guardados por sessão (só números; os gráficos não são
+# guardados)
+PAYLOAD_SIZES_CACHED = 16
+
+# Limite inferior da escala quando há células ≤ 0 mm: tudo abaixo dele é
+# "grampeado" na cor preta
+BLACK_ZMIN = -0.05
+
+HOVER_TEMPLATE = (
+    "<b>Tubo:</b> %{x}<br>"
+    "<b>Elevação:</b> %{y:.3f} m<br>"
+    "<b>Espessura:</b> %{z:.3f} mm"
+    "<extra></extra>"
+)
+
+
+def _colorscale(zmin):
+    def normalize(v):
+        return (v - zmin) / (FIX_MAX - zmin)
+
+    stops = [
+        [normalize(FIX_MIN), "darkred"],
+        [normalize(3.5), "red"],
+        [normalize(3.6), "yellow"],
+        [normalize(4.1), "gold"],
+        [normalize(4.2), "lightgreen"],
+        [normalize(FIX_MAX), "green"],
+    ]
+    if zmin < FIX_MIN:
+        # ≤ 0 mm em preto; entre 0 e FIX_MIN, darkred (como o valor grampeado
+        # da escala original)
+        stops = [
+            [0.0, "black"],
+            [normalize(0.0), "black"],
+            [float(np.nextafter(normalize(0.0), 1.0)), "darkred"],
+        ] + stops
+    return stops
+# =====================================
+
+
+def heatmap_z(values, min_value, max_value):
+    """
+    Valores do heatmap (float32): leituras dentro do intervalo e > 0, mais
+    todas as leituras ≤ 0 mm (pretas); o resto fica vazio (NaN)
+    """
+    with np.errstate(invalid="ignore"):
+        shown = ((values >= min_value) & (values <= max_value)) | (values <= 0)
+    return np.where(shown, values, np.nan).astype(np.float32)
+
+
+def _x_ticks(cols):
+    # ---- ticks do eixo X: marcar de 5 em 5 colunas ----
+    tick_idx = list(range(0, len(cols), 5))
+    if cols and (len(cols) - 1) not in tick_idx:
+        tick_idx.append(len(cols) - 1)
+    return [cols[i] for i in tick_idx]
+
+
+def _y_tick0(elevations):
+    # ---- eixo Y: marcar de 2 em 2 m (dtick) ----
+    if np.isfinite(elevations).any():
+        y_min = float(np.nanmin(elevations))
+        y_max = float(np.nanmax(elevations))
+    else:
+        y_min, y_max = 0.0, 0.0
+    return 2.0 * np.floor(min(y_min, y_max) / 2.0)
+
+
+def _axes_layout(elevations, cols):
+    x_tickvals = _x_ticks(cols)
+    return dict(
+        hovermode="closest",
+        yaxis=dict(
+            title="Elevação",
+            type="linear",
+            tickmode="linear",
+            tick0=_y_tick0(np.asarray(elevations, dtype=float)),
+            dtick=2.0,
+            tickformat=".0f",
+            ticksuffix=" m",
+        ),
+        xaxis=dict(
+            title="Tubos",
+            type="category",
+            categoryorder="array",
+            categoryarray=cols,
+            tickmode="array",
+            tickvals=x_tickvals,
+            ticktext=x_tickvals,
+            automargin=True,
+        ),
+    )
+
+
+def build_heatmap_figure(values, elevations, tubes, min_value, max_value, shapes=(), z=None):
+    """
+    Monta o heatmap das leituras (elevação × tubos) filtradas pelo intervalo,
+    com os contornos (`shapes`) opcionais por cima. `z` é o resultado de
+    `heatmap_z` já calculado (ex.: compartilhado entre as sessões)
+    """
+    if z is None:
+        z = heatmap_z(values, min_value, max_value)
+    with np.errstate(invalid="ignore"):
+        has_black = bool((z <= 0).any())
+    zmin = BLACK_ZMIN if has_black else FIX_MIN
+
+    # X categórico na ordem original
+    cols = [str(t) for t in tubes]
+
+    fig = go.Figure(data=go.Heatmap(
+        z=z,
+        y=np.asarray(elevations, dtype=float),
+        x=cols,
+        zmin=zmin,
+        zmax=FIX_MAX,
+        colorscale=_colorscale(zmin),
+        hovertemplate=HOVER_TEMPLATE,
+        hoverongaps=False,
+    ))
+
+    fig.update_layout(**_axes_layout(elevations, cols), shapes=list(shapes))
+    return fig
+
+
+def build_layer_figure(values, elevations, tubes, label, unit, colorscale, zmin, zmax):
+    """
+    Monta o heatmap de uma camada derivada (ex.: taxa de corrosão, vida
+    remanescente), com os mesmos eixos do heatmap de espessuras
+    """
+    cols = [str(t) for t in tubes]
+    fig = go.Figure(data=go.Heatmap(
+        z=np.asarray(values, dtype=np.float32),
+        y=np.asarray(elevations, dtype=float),
+        x=cols,
+        zmin=zmin,
+        zmax=zmax,
+        colorscale=colorscale,
+        colorbar=dict(title=unit),
+        hovertemplate=(
+            "<b>Tubo:</b> %{x}<br>"
+            "<b>Elevação:</b> %{y:.3f} m<br>"
+            f"<b>{label}:</b> %{{z:.2f}} {unit}"
+            "<extra></extra>"
+        ),
+        hoverongaps=False,
+    ))
+    fig.update_layout(**_axes_layout(elevations, cols))
+    return fig
+
+
+def figure_payload_size(fig):
+    """
+    Tamanho (bytes) do JSON do gráfico enviado ao navegador
+    """
+    return len(pio.to_json(fig, validate=False).encode("utf-8"))
+
+
+class PayloadSizes:
+    """
+    Tamanho do JSON de cada gráfico, por (janela, contornos), com descarte
+    LRU: o z binário tem tamanho fixo, então o JSON é gerado uma vez por
+    chave, qualquer que seja o intervalo do slider
+    """
+
+    def __init__(self, maxsize=PAYLOAD_SIZES_CACHED):
+        self._cache = LRUCache(maxsize=maxsize)
+
+    def get(self, key, fig):
+        size = self._cache.get(key)
+        if size is None:
+            size = figure_payload_size(fig)
+            self._cache[key] = size
+        return size
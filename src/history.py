@@ -0,0 +1,125 @@
+# type: ignore
+
+"""
+Script para comparar várias inspeções da mesma caldeira: alinhamento dos
+grids por (parede, tubo, elevação), taxa de corrosão (mm/ano) e vida
+remanescente até a espessura mínima
+"""
+
+import threading
+
+import numpy as np
+from cachetools import LRUCache
+
+# Diferença máxima (m) entre elevações consideradas o mesmo ponto
+ELEVATION_TOLERANCE_M = 0.01
+
+# Espessura mínima padrão para a vida remanescente (mm)
+MIN_THICKNESS_MM = 3.5
+
+# Vida remanescente exibida no máximo até este valor (anos)
+LIFE_CAP_YEARS = 50.0
+
+DAYS_PER_YEAR = 365.25
+
+_cache = LRUCache(maxsize=8)
+_cache_lock = threading.Lock()
+
+
+def align_grid(reference, grid, tolerance=ELEVATION_TOLERANCE_M):
+    """
+    Leituras de `grid` posicionadas no grid de referência (mesmo shape;
+    NaN onde não há leitura correspondente; a menor, se mais de uma)
+    """
+    aligned = np.full(reference.values.shape, np.nan, dtype=reference.values.dtype)
+    if grid.empty or reference.empty:
+        return aligned
+
+    # Tubos: junção pelos rótulos
+    src_cols = np.array(
+        [j for j, tube in enumerate(grid.tubes) if tube in reference.tube_positions],
+        dtype=np.intp,
+    )
+    dst_cols = np.array(
+        [reference.tube_positions[grid.tubes[j]] for j in src_cols], dtype=np.intp
+    )
+
+    # Elevações: linha de referência mais próxima, dentro da tolerância
+    dst_rows = reference.nearest_rows(grid.elevations)
+    close = np.abs(reference.elevations[dst_rows] - grid.elevations) <= tolerance
+    src_rows = np.flatnonzero(close)
+    dst_rows = dst_rows[close]
+
+    if src_rows.size and src_cols.size:
+        readings = grid.values[np.ix_(src_rows, src_cols)]
+        if np.unique(dst_rows).size == dst_rows.size:
+            aligned[np.ix_(dst_rows, dst_cols)] = readings
+        else:
+            # Linhas próximas caindo na mesma linha de referência: fica a menor
+            # leitura (lado conservador da taxa e da vida remanescente)
+            np.fmin.at(aligned, np.ix_(dst_rows, dst_cols), readings)
+    return aligned
+
+
+def thinning_rate(stack, years):
+    """
+    Taxa de perda de espessura (mm/ano, positiva = afinamento) por célula,
+    pela reta de mínimos quadrados das leituras válidas ao longo do tempo
+    """
+    valid = np.isfinite(stack)
+    t = np.broadcast_to(np.asarray(years, dtype=float)[:, None, None], stack.shape)
+    count = valid.sum(axis=0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_mean = np.where(valid, t, 0.0).sum(axis=0) / count
+        y_mean = np.where(valid, stack, 0.0).sum(axis=0) / count
+        dt = np.where(valid, t - t_mean, 0.0)
+        dy = np.where(valid, stack - y_mean, 0.0)
+        slope = (dt * dy).sum(axis=0) / (dt * dt).sum(axis=0)
+
+    slope[(count < 2) | ~np.isfinite(slope)] = np.nan
+    return -slope
+
+
+def remaining_life(current, rate, min_thickness, cap=LIFE_CAP_YEARS):
+    """
+    Anos até a espessura mínima, mantida a taxa atual (limitado a `cap`;
+    0 quando já está abaixo do mínimo)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        life = np.where(rate > 0, (current - min_thickness) / rate, cap)
+    life = np.clip(life, 0.0, cap)
+    life[~np.isfinite(current) | np.isnan(rate)] = np.nan
+    return life
+
+
+def aligned_history(reference, others, sheet):
+    """
+    Alinha o componente `sheet` das inspeções à de referência e calcula a
+    taxa de corrosão. Retorna (anos relativos à referência, pilha T×R×C,
+    taxa R×C); resultado guardado por (hashes, componente)
+    """
+    others = [
+        other for other in others
+        if sheet in other.sheets and other.date is not None and other.hash != reference.hash
+    ]
+    key = (reference.hash, tuple(sorted(o.hash for o in others)), sheet)
+    with _cache_lock:
+        cached = _cache.get(key)
+    if cached is not None:
+        return cached
+
+    inspections = sorted([reference] + others, key=lambda insp: insp.date)
+    base = reference.sheets[sheet]
+    years = np.array(
+        [(insp.date - reference.date).days / DAYS_PER_YEAR for insp in inspections]
+    )
+    stack = np.stack([
+        base.values if insp is reference else align_grid(base, insp.sheets[sheet])
+        for insp in inspections
+    ])
+    result = (years, stack, thinning_rate(stack, years))
+
+    with _cache_lock:
+        _cache[key] = result
+    return result
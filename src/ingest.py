@@ -0,0 +1,246 @@
+# type: ignore
+
+"""
+Script para a leitura do arquivo de inspeção (.xlsx) em modo streaming
+(openpyxl read_only), preenchendo diretamente um array float por componente
+"""
+
+import io
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from inspection import Inspection, SheetGrid, cached_inspection, content_hash
+from instrumentation import stage
+from parallel import MAX_WORKERS, map_ordered
+
+SUMMARY_SHEET = "Summary"
+PHOTOS_SHEET = "Photos"
+
+# Linhas de cabeçalho abaixo dos rótulos dos tubos (mesmo corte do iloc[3:])
+HEADER_ROWS = 3
+
+# Capacidade inicial quando a planilha não informa suas dimensões
+_DEFAULT_ROWS = 1024
+
+# Abaixo destes limites a leitura é feita em série (o custo de iniciar os
+# processos supera o ganho)
+PARALLEL_MIN_SHEETS = 4
+PARALLEL_MIN_BYTES = 2 * 1024 * 1024
+
+
+def column_labels(header):
+    """
+    Rótulos das colunas no mesmo formato que o pandas gera com header=0
+    (células vazias viram "Unnamed: n" e nomes repetidos ganham sufixo ".n")
+    """
+    labels = []
+    seen = {}
+    for j, value in enumerate(header):
+        if value is None or (isinstance(value, float) and np.isnan(value)):
+            label = f"Unnamed: {j}"
+        elif isinstance(value, float) and value.is_integer():
+            label = str(int(value))
+        else:
+            label = str(value)
+
+        count = seen.get(label, 0)
+        seen[label] = count + 1
+        if count:
+            label = f"{label}.{count}"
+        labels.append(label)
+    return labels
+
+
+def to_float(texts):
+    """
+    Converte textos para float de forma vetorizada, aceitando vírgula decimal
+    """
+    return pd.to_numeric(
+        pd.Series(texts, dtype=object).astype(str).str.replace(",", ".", regex=False),
+        errors="coerce",
+    ).to_numpy(dtype=float)
+
+
+def _fill_row(out, i, cells, texts):
+    """
+    Preenche a linha `i` de `out`; textos ficam pendentes para conversão
+    vetorizada no final
+    """
+    try:
+        # Caminho rápido: linha só com números
+        out[i, : len(cells)] = cells
+        return
+    except (TypeError, ValueError):
+        pass
+
+    for j, value in enumerate(cells):
+        if isinstance(value, (int, float)):
+            out[i, j] = value
+        elif isinstance(value, str):
+            out[i, j] = np.nan
+            texts.append((i, j, value))
+        else:
+            out[i, j] = np.nan
+
+
+def _apply_texts(out, texts):
+    if texts:
+        rows, cols, values = zip(*texts)
+        out[np.asarray(rows), np.asarray(cols)] = to_float(values)
+
+
+def _header_width(header):
+    width = len(header)
+    while width and header[width - 1] is None:
+        width -= 1
+    return width
+
+
+def parse_component(name, rows, max_row=None):
+    """
+    Lê as linhas de um componente: 1ª linha = rótulos dos tubos, depois
+    HEADER_ROWS linhas ignoradas e então elevação + leituras
+    """
+    header = next(rows, None)
+    width = _header_width(header) if header else 0
+    tubes = tuple(column_labels(header[:width])[1:]) if width else ()
+
+    if width < 2:
+        return SheetGrid(name, np.empty(0), tubes, np.empty((0, len(tubes))))
+
+    for _ in range(HEADER_ROWS):
+        if next(rows, None) is None:
+            break
+
+    capacity = max((max_row or 0) - 1 - HEADER_ROWS, 0) or _DEFAULT_ROWS
+    out = np.empty((capacity, width), dtype=float)
+    texts = []
+
+    n = 0
+    for row in rows:
+        if n == capacity:
+            capacity *= 2
+            out = np.resize(out, (capacity, width))
+        cells = row[:width]
+        if len(cells) < width:
+            out[n, len(cells):] = np.nan
+        _fill_row(out, n, cells, texts)
+        n += 1
+
+    out = out[:n]
+    _apply_texts(out, texts)
+
+    # Remove linhas sem elevação válida
+    valid = ~np.isnan(out[:, 0])
+    elevations = out[valid, 0].copy()
+    values = np.ascontiguousarray(out[valid, 1:])
+    return SheetGrid(name, elevations, tubes, values)
+
+
+def parse_summary(rows):
+    """
+    Lê empresa, refinaria e data da aba Summary (coluna B, linhas 1, 2 e 4)
+    """
+    cells = [row[1] if len(row) > 1 else None for _, row in zip(range(4), rows)]
+    cells += [None] * (4 - len(cells))
+    company, site, _, date = cells
+    return company, site, pd.to_datetime(date).date()
+
+
+def parse_photos(rows):
+    """
+    Lê a aba Photos como tabela (1ª linha = nomes das colunas)
+    """
+    header = next(rows, None)
+    if header is None:
+        return pd.DataFrame()
+    width = _header_width(header)
+    data = [row[:width] for row in rows if any(v is not None for v in row[:width])]
+    return pd.DataFrame(data, columns=column_labels(header[:width]))
+
+
+def _parse_sheet_file(args):
+    """
+    Tarefa do pool: abre o arquivo e lê apenas um componente
+    """
+    path, name = args
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[name]
+        return parse_component(name, worksheet.iter_rows(values_only=True), worksheet.max_row)
+    finally:
+        workbook.close()
+
+
+def _parse_components_parallel(data, names, max_workers):
+    # Os processos leem o arquivo do disco em vez de receber os bytes
+    # por tarefa
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        grids = map_ordered(
+            _parse_sheet_file, [(path, name) for name in names], max_workers
+        )
+    finally:
+        os.remove(path)
+    return dict(zip(names, grids))
+
+
+def parse_workbook(data, digest=None, max_workers=None, parallel=None):
+    """
+    Lê todas as abas do arquivo .xlsx; os componentes são lidos em paralelo
+    em arquivos grandes (`parallel=None` decide pelo tamanho). Com menos de
+    dois processos efetivos a leitura é sempre em série, em memória
+    """
+    workbook = load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        company, site, date = parse_summary(
+            workbook[SUMMARY_SHEET].iter_rows(values_only=True)
+        )
+
+        photos = None
+        if PHOTOS_SHEET in workbook.sheetnames:
+            photos = parse_photos(workbook[PHOTOS_SHEET].iter_rows(values_only=True))
+
+        names = [
+            name for name in workbook.sheetnames
+            if name not in (SUMMARY_SHEET, PHOTOS_SHEET)
+        ]
+        if parallel is None:
+            parallel = len(names) >= PARALLEL_MIN_SHEETS and len(data) >= PARALLEL_MIN_BYTES
+        # Com um só processo o caminho paralelo seria em série, mas relendo o
+        # arquivo inteiro (do disco) para cada aba
+        parallel = parallel and min(max_workers or MAX_WORKERS, len(names)) >= 2
+
+        if not parallel:
+            sheets = {}
+            for name in names:
+                worksheet = workbook[name]
+                with stage(f"parse:{name}"):
+                    sheets[name] = parse_component(
+                        name, worksheet.iter_rows(values_only=True), worksheet.max_row
+                    )
+    finally:
+        workbook.close()
+
+    if parallel:
+        with stage(f"parse:{len(names)} abas em paralelo"):
+            sheets = _parse_components_parallel(data, names, max_workers)
+
+    return Inspection(digest or content_hash(data), company, site, date, sheets, photos)
+
+
+def load_inspection(uploaded_file):
+    """
+    Retorna a inspeção do arquivo carregado, processando o .xlsx apenas na
+    primeira vez em que o conteúdo é visto
+    """
+    data = uploaded_file.getvalue()
+    with stage("content_hash"):
+        key = content_hash(data)
+    return cached_inspection(key, lambda: parse_workbook(data, key))
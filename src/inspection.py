@@ -0,0 +1,259 @@
+# type: ignore
+
+"""
+Script com a estrutura das inspeções já processadas e o cache em memória
+(chave = hash do conteúdo do arquivo)
+
+As leituras ficam em float32 e somente leitura, compartilhadas por todas as
+sessões: cada sessão guarda um InspectionHandle (contagem de referências) e
+uma inspeção em uso nunca é descartada do cache nem carregada duas vezes
+"""
+
+import hashlib
+import threading
+import weakref
+from dataclasses import dataclass, field
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+# Limite de memória do cache de inspeções (bytes)
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Limite de memória dos dados derivados compartilhados (leituras ajustadas,
+# pirâmides LOD)
+DERIVED_MAX_BYTES = 256 * 1024 * 1024
+
+# Leituras em mm com até 3 casas: float32 (7 dígitos) basta e ocupa metade
+VALUE_DTYPE = np.float32
+
+
+def readonly(array):
+    """
+    Marca o array como somente leitura (compartilhado entre sessões)
+    """
+    array.flags.writeable = False
+    return array
+
+
+@dataclass(frozen=True)
+class SheetGrid:
+    """
+    Leituras de um componente: elevação (m) × tubos, em mm
+    """
+
+    name: str
+    elevations: np.ndarray
+    tubes: tuple
+    values: np.ndarray
+
+    def __post_init__(self):
+        # Os arrays passam a pertencer ao grid (sem cópia quando já estão no
+        # formato certo)
+        elevations = np.asarray(self.elevations, dtype=float)
+        values = np.ascontiguousarray(self.values, dtype=VALUE_DTYPE)
+        object.__setattr__(self, "elevations", readonly(elevations))
+        object.__setattr__(self, "values", readonly(values))
+
+    @property
+    def nbytes(self):
+        return int(self.elevations.nbytes + self.values.nbytes)
+
+    @property
+    def empty(self):
+        return self.values.size == 0
+
+    @cached_property
+    def sorted_values(self):
+        """
+        Leituras válidas em ordem crescente (calculado uma vez por componente)
+        """
+        values = self.values[np.isfinite(self.values)]
+        values.sort()
+        return readonly(values)
+
+    @cached_property
+    def elevation_index(self):
+        """
+        Elevações em ordem crescente e a linha correspondente de cada uma
+        """
+        order = np.argsort(self.elevations, kind="stable")
+        return self.elevations[order], order
+
+    @cached_property
+    def tube_positions(self):
+        """
+        Rótulo do tubo → coluna do grid
+        """
+        return {tube: j for j, tube in enumerate(self.tubes)}
+
+    def nearest_rows(self, elevations):
+        """
+        Linha de elevação mais próxima de cada elevação informada (bisect)
+        """
+        sorted_elev, order = self.elevation_index
+        elevations = np.atleast_1d(np.asarray(elevations, dtype=float))
+        if sorted_elev.size == 0:
+            return np.full(elevations.shape, -1, dtype=np.intp)
+        if sorted_elev.size == 1:
+            return np.full(elevations.shape, order[0], dtype=np.intp)
+        right = np.clip(np.searchsorted(sorted_elev, elevations), 1, sorted_elev.size - 1)
+        left = right - 1
+        pick_left = np.abs(elevations - sorted_elev[left]) <= np.abs(sorted_elev[right] - elevations)
+        return order[np.where(pick_left, left, right)]
+
+    def rows_between(self, low, high):
+        """
+        Linhas com elevação em [low, high]
+        """
+        sorted_elev, order = self.elevation_index
+        start = np.searchsorted(sorted_elev, min(low, high), side="left")
+        stop = np.searchsorted(sorted_elev, max(low, high), side="right")
+        return order[start:stop]
+
+    def locate(self, tubes, elevations):
+        """
+        Converte pontos (tubo, elevação) em (linha, coluna) do grid; coluna
+        -1 para tubos desconhecidos
+        """
+        cols = np.array([self.tube_positions.get(str(t), -1) for t in tubes], dtype=np.intp)
+        return self.nearest_rows(elevations), cols
+
+    def to_frame(self):
+        """
+        Retorna as leituras como DataFrame (índice = elevação, colunas = tubos)
+        """
+        return pd.DataFrame(self.values, index=self.elevations, columns=list(self.tubes))
+
+
+@dataclass(frozen=True)
+class Inspection:
+    """
+    Arquivo de inspeção já processado: metadados, componentes e aba Photos
+    """
+
+    hash: str
+    company: object
+    site: object
+    date: object
+    sheets: dict = field(default_factory=dict)
+    photos: pd.DataFrame = None
+
+    @property
+    def sheet_names(self):
+        return list(self.sheets)
+
+    @property
+    def nbytes(self):
+        size = sum(grid.nbytes for grid in self.sheets.values())
+        if self.photos is not None:
+            size += int(self.photos.memory_usage(deep=True).sum())
+        return size
+
+
+_cache = LRUCache(maxsize=CACHE_MAX_BYTES, getsizeof=lambda insp: insp.nbytes)
+_cache_lock = threading.Lock()
+
+# Inspeções em uso por alguma sessão: hash → [inspeção, referências]
+_pinned = {}
+
+_derived = LRUCache(maxsize=DERIVED_MAX_BYTES, getsizeof=lambda item: item.nbytes)
+_derived_lock = threading.Lock()
+
+
+def content_hash(data):
+    """
+    Hash do conteúdo do arquivo carregado
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+def cached_inspection(key, loader):
+    """
+    Retorna a inspeção do cache ou a carrega com `loader()` e armazena
+    """
+    with _cache_lock:
+        pinned = _pinned.get(key)
+        inspection = pinned[0] if pinned else _cache.get(key)
+    if inspection is not None:
+        return inspection
+
+    inspection = loader()
+
+    with _cache_lock:
+        try:
+            _cache[key] = inspection
+        except ValueError:
+            # Inspeção maior que o limite do cache: usa sem armazenar
+            pass
+    return inspection
+
+
+def _pin(inspection):
+    with _cache_lock:
+        entry = _pinned.setdefault(inspection.hash, [inspection, 0])
+        entry[1] += 1
+
+
+def _unpin(digest):
+    with _cache_lock:
+        entry = _pinned.get(digest)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _pinned[digest]
+        # Sem sessões: volta a depender só do LRU
+        try:
+            _cache[digest] = entry[0]
+        except ValueError:
+            pass
+
+
+class InspectionHandle:
+    """
+    Referência de uma sessão a uma inspeção; enquanto existir, a inspeção
+    fica no cache. É liberada com release() ou quando a sessão a descarta
+    """
+
+    def __init__(self, inspection):
+        self.inspection = inspection
+        _pin(inspection)
+        self._finalizer = weakref.finalize(self, _unpin, inspection.hash)
+
+    def release(self):
+        self._finalizer()
+
+
+def cache_stats():
+    """
+    Inspeções em uso (e referências) e ocupação dos caches, em bytes
+    """
+    with _cache_lock:
+        pinned = {digest: refs for digest, (_, refs) in _pinned.items()}
+        cached = _cache.currsize
+    with _derived_lock:
+        derived = _derived.currsize
+    return {"pinned": pinned, "cache_bytes": cached, "derived_bytes": derived}
+
+
+def cached_derived(key, builder):
+    """
+    Dado derivado de uma inspeção (ex.: leituras ajustadas) compartilhado
+    entre as sessões; `builder()` deve retornar um objeto com `nbytes`
+    """
+    with _derived_lock:
+        item = _derived.get(key)
+    if item is not None:
+        return item
+
+    item = builder()
+    with _derived_lock:
+        try:
+            _derived[key] = item
+        except ValueError:
+            pass
+    return item
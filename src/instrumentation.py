@@ -0,0 +1,253 @@
+# type: ignore
+
+"""
+Script para medir cada etapa de um rerun: tempo de relógio e, quando
+ligado, pico de memória (tracemalloc). Exporta em JSON lines ou no formato
+texto do Prometheus
+
+As etapas são marcadas com `with stage("nome"):` em qualquer módulo; fora de
+um rerun medido (ou em outros processos/threads) o bloco não mede nada
+
+O tracemalloc é do processo: fica ligado enquanto houver algum rerun medido
+(contagem de referências) e os picos incluem as alocações de todas as
+sessões que rodam ao mesmo tempo
+"""
+
+import contextlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import tracemalloc
+import weakref
+from dataclasses import asdict, dataclass, field
+
+# "1" liga a medição por padrão; CALDEIRA_PROFILE_LOG = arquivo .jsonl onde
+# cada rerun medido é acrescentado
+PROFILE_ENV = "CALDEIRA_PROFILE"
+PROFILE_LOG_ENV = "CALDEIRA_PROFILE_LOG"
+
+METRIC_PREFIX = "caldeira"
+
+# Os picos de memória são do processo inteiro (todas as sessões)
+PEAK_SCOPE = "process"
+
+# Descrição (# HELP) dos dados extras conhecidos das etapas
+EXTRA_HELP = {
+    "payload_bytes": "Tamanho do JSON do gráfico enviado ao navegador no último rerun (bytes)",
+    "regions": "Regiões finas encontradas no último rerun",
+}
+
+_local = threading.local()
+
+# Reruns medidos em andamento que usam o tracemalloc
+_tracing_refs = 0
+_tracing_lock = threading.Lock()
+
+
+def _acquire_tracing():
+    global _tracing_refs
+    with _tracing_lock:
+        if _tracing_refs == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_refs += 1
+
+
+def _release_tracing():
+    global _tracing_refs
+    with _tracing_lock:
+        _tracing_refs -= 1
+        if _tracing_refs == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _reset_peak():
+    # Com outro rerun medido em andamento o pico não é zerado (zerar
+    # apagaria o pico da outra sessão): fica o maior valor desde o último
+    # reset, nunca menor que o real
+    if _tracing_refs == 1:
+        tracemalloc.reset_peak()
+
+
+@dataclass(frozen=True)
+class StageRecord:
+    """
+    Uma etapa medida: início relativo ao rerun, duração, pico de memória
+    do processo acima do uso no início (None sem tracemalloc) e dados extras
+    """
+
+    stage: str
+    start: float
+    seconds: float
+    peak_bytes: int = None
+    depth: int = 0
+    extra: dict = field(default_factory=dict)
+
+
+class RerunProfile:
+    """
+    Etapas medidas em um rerun
+    """
+
+    def __init__(self, memory=False):
+        self.timestamp = time.time()
+        self.memory = memory
+        self.records = []
+        self._origin = time.perf_counter()
+        self._stack = []
+        # Libera o tracemalloc no fim do rerun (ou se o rerun for abandonado)
+        self.release = (
+            weakref.finalize(self, _release_tracing) if memory else lambda: None
+        )
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        extra = {}
+        frame = {"base": 0, "peak": 0}
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # O pico até aqui pertence à etapa externa
+            if self._stack:
+                self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+            _reset_peak()
+            frame["base"] = current
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield extra
+        finally:
+            seconds = time.perf_counter() - start
+            self._stack.pop()
+            peak_bytes = None
+            if self.memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame["peak"])
+                _reset_peak()
+                if self._stack:
+                    self._stack[-1]["peak"] = max(self._stack[-1]["peak"], peak)
+                peak_bytes = max(peak - frame["base"], 0)
+            self.records.append(StageRecord(
+                name, start - self._origin, seconds, peak_bytes, len(self._stack), extra
+            ))
+
+    def sorted_records(self):
+        return sorted(self.records, key=lambda r: (r.start, r.depth))
+
+
+def profiling_default():
+    return os.environ.get(PROFILE_ENV, "") == "1"
+
+
+def begin_rerun(enabled, memory=True):
+    """
+    Inicia a medição do rerun atual (ou desliga, se `enabled` for falso).
+    Não mexe no tracemalloc de outras sessões: ele só é desligado quando
+    nenhum rerun medido está em andamento
+    """
+    previous = current_profile()
+    if previous is not None:
+        previous.release()
+    _local.profile = None
+    if not enabled:
+        return None
+
+    if memory:
+        _acquire_tracing()
+    _local.profile = RerunProfile(memory=memory)
+    return _local.profile
+
+
+def current_profile():
+    return getattr(_local, "profile", None)
+
+
+def stage(name):
+    """
+    Mede o bloco como uma etapa do rerun atual; o dicionário retornado
+    recebe dados extras (ex.: tamanho do payload)
+    """
+    profile = current_profile()
+    if profile is None:
+        return contextlib.nullcontext({})
+    return profile.stage(name)
+
+
+def finish_rerun():
+    """
+    Encerra a medição do rerun e grava no log (se configurado)
+    """
+    profile = current_profile()
+    _local.profile = None
+    if profile is not None:
+        profile.release()
+        path = os.environ.get(PROFILE_LOG_ENV)
+        if path:
+            with open(path, "a", encoding="utf-8") as file:
+                file.write(to_json_lines(profile))
+    return profile
+
+
+def to_json_lines(profile):
+    """
+    Uma linha JSON por etapa
+    """
+    lines = [
+        json.dumps(
+            {"timestamp": profile.timestamp, **asdict(record), "peak_scope": PEAK_SCOPE},
+            ensure_ascii=False,
+        )
+        for record in profile.sorted_records()
+    ]
+    return "".join(line + "\n" for line in lines)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _metric_value(value):
+    # Só números entram no formato texto (bool, None e textos são ignorados)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return "NaN" if math.isnan(value) else ("+Inf" if value > 0 else "-Inf")
+    return str(value)
+
+
+def to_prometheus(profile):
+    """
+    Métricas do rerun no formato texto do Prometheus (gauges por etapa)
+    """
+    records = profile.sorted_records()
+    metrics = [
+        ("stage_seconds", "Duração da etapa no último rerun (s)", lambda r: r.seconds),
+        ("stage_process_peak_bytes",
+         "Pico de memória do processo (todas as sessões) durante a etapa no último rerun (bytes)",
+         lambda r: r.peak_bytes),
+    ]
+    lines = []
+    for name, help_text, value in metrics:
+        lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+        lines.append(f"# TYPE {METRIC_PREFIX}_{name} gauge")
+        for record in records:
+            text = _metric_value(value(record))
+            if text is not None:
+                lines.append(f'{METRIC_PREFIX}_{name}{{stage="{_label(record.stage)}"}} {text}')
+
+    extras = sorted({key for record in records for key in record.extra})
+    for key in extras:
+        samples = [
+            (record.stage, _metric_value(record.extra.get(key))) for record in records
+        ]
+        samples = [(stage_name, text) for stage_name, text in samples if text is not None]
+        if not samples:
+            continue
+        name = f"{METRIC_PREFIX}_stage_{re.sub(r'[^a-zA-Z0-9_]', '_', str(key))}"
+        help_text = EXTRA_HELP.get(key, f"Dado extra {key} da etapa no último rerun")
+        help_text = help_text.replace("\\", "\\\\").replace("\n", " ")
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for stage_name, text in samples:
+            lines.append(f'{name}{{stage="{_label(stage_name)}"}} {text}')
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,208 @@
+# type: ignore
+
+"""
+Script para o armazenamento das inspeções já carregadas em formato colunar
+(Arrow IPC), endereçadas pelo hash do conteúdo do arquivo original
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+import pyarrow as pa
+
+from inspection import Inspection, SheetGrid, cached_inspection
+
+LIBRARY_DIR = "data/inspecoes"
+
+SUMMARY_FILE = "summary.arrow"
+PHOTOS_FILE = "photos.arrow"
+ELEVATION_COLUMN = "elevation"
+
+# Exibido no lugar de empresa, refinaria ou data não informadas
+MISSING_LABEL = "-"
+
+
+@dataclass(frozen=True)
+class LibraryEntry:
+    """
+    Inspeção disponível na biblioteca
+    """
+
+    hash: str
+    company: str
+    site: str
+    date: object
+    source: str
+
+    def label(self):
+        company, site = self.company or MISSING_LABEL, self.site or MISSING_LABEL
+        return f"{self.date or MISSING_LABEL} — {company} / {site} ({self.source})"
+
+
+def optional_text(value):
+    """
+    Texto do campo (empresa, refinaria) ou None quando não informado. Aceita
+    o "None" literal gravado por versões anteriores da biblioteca
+    """
+    if value is None or value == "None":
+        return None
+    return str(value)
+
+
+_listing_cache = {}
+_listing_lock = threading.Lock()
+
+
+def _write_table(table, path):
+    with pa.OSFile(path, "wb") as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def _read_table(path):
+    # Memory map: os buffers das colunas apontam direto para o arquivo
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _sheet_file(index):
+    return f"sheet_{index:03d}.arrow"
+
+
+def sheet_to_table(grid):
+    """
+    Converte o grid de um componente em tabela (elevação + uma coluna por tubo)
+    """
+    columns = [pa.array(grid.elevations, type=pa.float64())]
+    columns += [pa.array(grid.values[:, j], type=pa.float32()) for j in range(len(grid.tubes))]
+    names = [ELEVATION_COLUMN] + list(grid.tubes)
+    return pa.Table.from_arrays(columns, names=names).replace_schema_metadata(
+        {"sheet": grid.name}
+    )
+
+
+def table_to_sheet(table, name=None):
+    """
+    Converte a tabela (elevação + uma coluna por tubo) no grid do componente
+    """
+    metadata = table.schema.metadata or {}
+    if name is None:
+        name = metadata.get(b"sheet", b"").decode("utf-8")
+
+    elevations = table.column(0).to_numpy()
+    tubes = tuple(table.column_names[1:])
+    if tubes:
+        values = np.column_stack([col.to_numpy() for col in table.columns[1:]])
+    else:
+        values = np.empty((len(elevations), 0))
+    return SheetGrid(name, elevations, tubes, values)
+
+
+def _summary_table(inspection, source):
+    return pa.table(
+        {
+            "company": pa.array([optional_text(inspection.company)], pa.string()),
+            "site": pa.array([optional_text(inspection.site)], pa.string()),
+            "date": pa.array([inspection.date], pa.date32()),
+            "source": pa.array([source or ""], pa.string()),
+            "sheets": pa.array([inspection.sheet_names], pa.list_(pa.string())),
+        }
+    )
+
+
+def has_inspection(digest, root=LIBRARY_DIR):
+    return os.path.isfile(os.path.join(root, digest, SUMMARY_FILE))
+
+
+def store_inspection(inspection, source=None, root=LIBRARY_DIR):
+    """
+    Grava a inspeção na biblioteca (se ainda não estiver gravada)
+    """
+    if has_inspection(inspection.hash, root):
+        return
+
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    try:
+        for index, grid in enumerate(inspection.sheets.values()):
+            _write_table(sheet_to_table(grid), os.path.join(tmp_dir, _sheet_file(index)))
+
+        if inspection.photos is not None:
+            photos = inspection.photos.astype("string")
+            photos.columns = [str(c) for c in photos.columns]
+            _write_table(
+                pa.Table.from_pandas(photos, preserve_index=False),
+                os.path.join(tmp_dir, PHOTOS_FILE),
+            )
+
+        # summary por último: sua presença indica inspeção completa
+        _write_table(_summary_table(inspection, source), os.path.join(tmp_dir, SUMMARY_FILE))
+        os.replace(tmp_dir, os.path.join(root, inspection.hash))
+    except OSError:
+        # Outra sessão gravou a mesma inspeção primeiro
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if not has_inspection(inspection.hash, root):
+            raise
+
+
+def _read_inspection(digest, root):
+    folder = os.path.join(root, digest)
+    summary = _read_table(os.path.join(folder, SUMMARY_FILE)).to_pylist()[0]
+
+    sheets = {}
+    for index, name in enumerate(summary["sheets"]):
+        table = _read_table(os.path.join(folder, _sheet_file(index)))
+        sheets[name] = table_to_sheet(table, name)
+
+    photos = None
+    photos_path = os.path.join(folder, PHOTOS_FILE)
+    if os.path.isfile(photos_path):
+        photos = _read_table(photos_path).to_pandas()
+
+    return Inspection(
+        digest, optional_text(summary["company"]), optional_text(summary["site"]),
+        summary["date"], sheets, photos,
+    )
+
+
+def open_inspection(digest, root=LIBRARY_DIR):
+    """
+    Abre uma inspeção da biblioteca (sem passar pelo .xlsx)
+    """
+    return cached_inspection(digest, lambda: _read_inspection(digest, root))
+
+
+def list_inspections(root=LIBRARY_DIR):
+    """
+    Lista as inspeções da biblioteca, das mais recentes para as mais antigas
+    """
+    try:
+        mtime = os.stat(root).st_mtime_ns
+    except FileNotFoundError:
+        return []
+
+    with _listing_lock:
+        cached = _listing_cache.get(root)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    entries = []
+    for digest in os.listdir(root):
+        if not has_inspection(digest, root):
+            continue
+        row = _read_table(os.path.join(root, digest, SUMMARY_FILE)).to_pylist()[0]
+        entries.append(
+            LibraryEntry(
+                digest, optional_text(row["company"]), optional_text(row["site"]),
+                row["date"], row["source"],
+            )
+        )
+    entries.sort(key=lambda e: (e.date is not None, e.date), reverse=True)
+
+    with _listing_lock:
+        _listing_cache[root] = (mtime, entries)
+    return entries
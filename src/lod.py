@@ -0,0 +1,131 @@
+# type: ignore
+
+"""
+Script com a pirâmide de níveis de detalhe (LOD) das leituras para grids
+muito grandes
+
+Cada nível reduz o anterior em blocos 2×2 guardando o MÍNIMO do bloco, para
+que pontos finos nunca sejam apagados pela média. A visão geral usa o nível
+mais fino que cabe no limite de células; uma janela (faixa de elevação e
+tubos) usa só os blocos dessa janela, em resolução total quando couber
+"""
+
+import threading
+
+import numpy as np
+
+# Limite de células enviadas ao navegador por gráfico
+LOD_MAX_CELLS = 250_000
+
+
+def _block_starts(n, factor):
+    return np.arange(0, n, factor)
+
+
+def min_pool(values, factor_y, factor_x, reducer=np.fmin):
+    """
+    Reduz o grid em blocos factor_y × factor_x pelo mínimo (ignora NaN;
+    bloco só com NaN continua NaN). `reducer=np.fmax` guarda o máximo
+    """
+    if values.size == 0:
+        return values
+    pooled = reducer.reduceat(values, _block_starts(values.shape[0], factor_y), axis=0)
+    return reducer.reduceat(pooled, _block_starts(values.shape[1], factor_x), axis=1)
+
+
+def _pool_elevations(elevations, factor):
+    # Elevação do bloco = média das elevações das linhas do bloco
+    starts = _block_starts(elevations.size, factor)
+    counts = np.diff(np.append(starts, elevations.size))
+    return np.add.reduceat(elevations, starts) / counts
+
+
+def _pool_labels(labels, factor):
+    labels = [str(t) for t in labels]
+    pooled = []
+    for start in range(0, len(labels), factor):
+        block = labels[start:start + factor]
+        pooled.append(block[0] if len(block) == 1 else f"{block[0]}–{block[-1]}")
+    return tuple(pooled)
+
+
+class Pyramid:
+    """
+    Pirâmide de mínimos de um grid (níveis calculados sob demanda). Para
+    camadas em que o pior valor é o maior (taxa de corrosão), usar
+    `reducer=np.fmax`
+    """
+
+    def __init__(self, values, elevations, tubes, reducer=np.fmin):
+        self.shape = values.shape
+        self._reducer = reducer
+        self._values = [values]
+        self._elevations = np.asarray(elevations, dtype=float)
+        self._tubes = tuple(str(t) for t in tubes)
+        # A pirâmide pode ser compartilhada entre sessões (threads)
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self):
+        return int(sum(level.nbytes for level in self._values))
+
+    def values(self, level):
+        with self._lock:
+            while len(self._values) <= level:
+                self._values.append(min_pool(self._values[-1], 2, 2, self._reducer))
+            return self._values[level]
+
+    def level_for(self, rows, cols, max_cells=LOD_MAX_CELLS):
+        """
+        Nível mais fino em que uma janela rows × cols cabe em max_cells
+        """
+        level = 0
+        while (-(-rows // 2 ** level)) * (-(-cols // 2 ** level)) > max_cells:
+            if rows <= 2 ** level and cols <= 2 ** level:
+                break
+            level += 1
+        return level
+
+    def view(self, row_range=None, col_range=None, max_cells=LOD_MAX_CELLS):
+        """
+        Janela [r0, r1) × [c0, c1) no nível mais fino que cabe em max_cells.
+        Retorna (valores, elevações, tubos, nível)
+        """
+        r0, r1 = row_range or (0, self.shape[0])
+        c0, c1 = col_range or (0, self.shape[1])
+        level = self.level_for(r1 - r0, c1 - c0, max_cells)
+
+        if level == 0:
+            return (
+                self._values[0][r0:r1, c0:c1],
+                self._elevations[r0:r1],
+                self._tubes[c0:c1],
+                0,
+            )
+
+        # Blocos do nível que cobrem a janela (alinhados à pirâmide)
+        factor = 2 ** level
+        b_r0, b_r1 = r0 // factor, -(-r1 // factor)
+        b_c0, b_c1 = c0 // factor, -(-c1 // factor)
+
+        values = self.values(level)[b_r0:b_r1, b_c0:b_c1]
+        elevations = _pool_elevations(
+            self._elevations[b_r0 * factor:min(b_r1 * factor, self.shape[0])], factor
+        )
+        tubes = _pool_labels(
+            self._tubes[b_c0 * factor:min(b_c1 * factor, self.shape[1])], factor
+        )
+        return values, elevations, tubes, level
+
+
+def index_window(elevations, elevation_range, tube_range):
+    """
+    Converte a faixa de elevação (m) e de tubos (posições) em índices
+    [r0, r1) × [c0, c1) do grid
+    """
+    low, high = elevation_range
+    rows = np.flatnonzero((elevations >= low) & (elevations <= high))
+    if rows.size == 0:
+        rows = np.arange(elevations.size)
+    c0, c1 = tube_range
+    return (int(rows[0]), int(rows[-1]) + 1), (int(c0), int(c1) + 1)
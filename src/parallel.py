@@ -0,0 +1,89 @@
+# type: ignore
+
+"""
+Script com o pool de processos compartilhado para o processamento paralelo
+das abas de componentes
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+# Número máximo de processos (0 ou ausente = número de núcleos)
+MAX_WORKERS = int(os.environ.get("CALDEIRA_WORKERS", "0") or 0) or os.cpu_count() or 1
+
+_executors = {}
+_lock = threading.Lock()
+
+
+def get_executor(max_workers=None):
+    """
+    Retorna o pool de processos (criado uma única vez por tamanho)
+    """
+    workers = max_workers or MAX_WORKERS
+    with _lock:
+        executor = _executors.get(workers)
+        if executor is None:
+            # "spawn": o servidor do Streamlit tem várias threads, fork não é seguro
+            executor = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            _executors[workers] = executor
+        return executor
+
+
+def _discard_executor(workers):
+    with _lock:
+        executor = _executors.pop(workers, None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def map_ordered(func, items, max_workers=None, parallel=True):
+    """
+    Aplica `func` a cada item, em paralelo quando vale a pena, e retorna os
+    resultados na mesma ordem dos itens
+    """
+    items = list(items)
+    workers = min(max_workers or MAX_WORKERS, len(items))
+    if not parallel or workers < 2:
+        return [func(item) for item in items]
+
+    pool_size = max_workers or MAX_WORKERS
+    try:
+        return list(get_executor(pool_size).map(func, items))
+    except BrokenProcessPool:
+        # Um processo morreu (ex.: falta de memória): refaz em série
+        _discard_executor(pool_size)
+        return [func(item) for item in items]
+
+
+def map_as_completed(func, items, max_workers=None, parallel=True):
+    """
+    Como `map_ordered`, mas gera (índice, resultado) à medida que cada item
+    termina (para relatar o progresso)
+    """
+    items = list(items)
+    workers = min(max_workers or MAX_WORKERS, len(items))
+    if not parallel or workers < 2:
+        for i, item in enumerate(items):
+            yield i, func(item)
+        return
+
+    pool_size = max_workers or MAX_WORKERS
+    pending = set(range(len(items)))
+    try:
+        executor = get_executor(pool_size)
+        futures = {executor.submit(func, item): i for i, item in enumerate(items)}
+        for future in as_completed(futures):
+            i = futures[future]
+            result = future.result()
+            pending.discard(i)
+            yield i, result
+    except BrokenProcessPool:
+        # Um processo morreu: o que faltou é feito em série
+        _discard_executor(pool_size)
+        for i in sorted(pending):
+            yield i, func(items[i])
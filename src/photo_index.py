@@ -0,0 +1,326 @@
+# type: ignore
+
+"""
+Script com os índices das fotos: a pasta de imagens (imgs/fotos) e a aba
+Photos do arquivo de inspeção
+
+A pasta é varrida uma única vez; cada nome de arquivo vira uma chave
+(parede, tubo, elevação em m) e as buscas são feitas em memória (bisect
+pela elevação mais próxima). O watchdog mantém o índice atualizado quando
+arquivos são criados, removidos ou renomeados
+
+A aba Photos vira, por arquivo (hash), um array ordenado de elevações por
+(parede, tubo), consultado com tolerância
+"""
+
+import bisect
+import os
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+from watchdog.events import FileSystemEventHandler
+from watchdog.observers import Observer
+
+FT_PER_M = 3.281
+
+# {WALL}_T{TUBO}_E{ELEV}.jpg | {WALL}_T{TUBO}_E{ELEV}ft.jpg | {WALL}_T{TUBO}.jpg
+PHOTO_PATTERN = re.compile(
+    r"^(?P<wall>.+)_T(?P<tube>[^_]+?)"
+    r"(?:_E(?P<elev>-?\d+(?:\.(?P<dec>\d+))?)(?P<ft>ft)?)?"
+    r"\.(?P<ext>jpe?g|png)$",
+    re.IGNORECASE,
+)
+
+# Maior tolerância possível (0 casas decimais em metros)
+_MAX_TOLERANCE = 0.5
+
+# Tolerância (m) entre a elevação do ponto e a da aba Photos (absorve o
+# arredondamento da conversão pés → metros)
+PHOTO_TOLERANCE_M = 0.01
+
+
+def parse_photo_name(name):
+    """
+    Converte o nome do arquivo em (parede, tubo, elevação_m, tolerância_m,
+    prioridade); elevação None para fotos só por tubo. None se o nome não
+    seguir os padrões
+    """
+    match = PHOTO_PATTERN.match(name)
+    if not match:
+        return None
+
+    ext_rank = 1 if match["ext"].lower() == "png" else 0
+    if match["elev"] is None:
+        return match["wall"], match["tube"], None, None, (2, 0, ext_rank)
+
+    decimals = len(match["dec"] or "")
+    # O nome casa com a elevação arredondada para o mesmo número de casas
+    tolerance = 0.5 * 10 ** -decimals + 1e-9
+    elevation = float(match["elev"])
+    if match["ft"]:
+        elevation /= FT_PER_M
+        tolerance /= FT_PER_M
+        unit_rank = 1
+    else:
+        unit_rank = 0
+    # Metros antes de pés, mais casas decimais antes, .jpg antes de .png
+    return match["wall"], match["tube"], elevation, tolerance, (unit_rank, -decimals, ext_rank)
+
+
+class PhotoIndex:
+    """
+    Índice em memória das fotos de uma pasta
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self._by_elevation = {}
+        self._by_tube = {}
+        self._lock = threading.Lock()
+        self._observer = None
+
+    def __len__(self):
+        with self._lock:
+            return sum(map(len, self._by_elevation.values())) + sum(
+                map(len, self._by_tube.values())
+            )
+
+    def scan(self):
+        """
+        Varre a pasta (uma chamada de listagem, sem stat por arquivo)
+        """
+        with os.scandir(self.folder) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    self.add(entry.path)
+
+    def add(self, path):
+        parsed = parse_photo_name(os.path.basename(path))
+        if parsed is None:
+            return
+        wall, tube, elevation, tolerance, priority = parsed
+        with self._lock:
+            if elevation is None:
+                entries = self._by_tube.setdefault((wall, tube), [])
+                if path not in (p for _, p in entries):
+                    bisect.insort(entries, (priority, path))
+            else:
+                entries = self._by_elevation.setdefault((wall, tube), [])
+                item = (elevation, tolerance, priority, path)
+                if item not in entries:
+                    bisect.insort(entries, item)
+
+    def remove(self, path):
+        parsed = parse_photo_name(os.path.basename(path))
+        if parsed is None:
+            return
+        wall, tube, elevation, _, _ = parsed
+        with self._lock:
+            index = self._by_tube if elevation is None else self._by_elevation
+            entries = index.get((wall, tube), [])
+            entries[:] = [item for item in entries if item[-1] != path]
+
+    def lookup(self, wall, tube, elevation_m):
+        """
+        Caminho da foto do ponto (parede, tubo, elevação em m) ou None
+        """
+        key = (str(wall), str(tube))
+        elevation_m = float(elevation_m)
+        with self._lock:
+            entries = self._by_elevation.get(key)
+            if entries:
+                lo = bisect.bisect_left(entries, (elevation_m - _MAX_TOLERANCE,))
+                hi = bisect.bisect_right(entries, (elevation_m + _MAX_TOLERANCE, float("inf")))
+                candidates = [
+                    (priority, abs(elevation - elevation_m), path)
+                    for elevation, tolerance, priority, path in entries[lo:hi]
+                    if abs(elevation - elevation_m) <= tolerance
+                ]
+                if candidates:
+                    return min(candidates)[2]
+
+            # Fallback por tubo (sem elevação)
+            tube_only = self._by_tube.get(key)
+            if tube_only:
+                return tube_only[0][1]
+        return None
+
+    def watch(self):
+        """
+        Mantém o índice atualizado com o watchdog
+        """
+        if self._observer is not None:
+            return
+        handler = _IndexUpdater(self)
+        observer = Observer()
+        observer.schedule(handler, self.folder, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+
+class _IndexUpdater(FileSystemEventHandler):
+    def __init__(self, index):
+        self.index = index
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.index.add(event.src_path)
+
+    def on_deleted(self, event):
+        if not event.is_directory:
+            self.index.remove(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.index.remove(event.src_path)
+            if os.path.dirname(event.dest_path) == self.index.folder:
+                self.index.add(event.dest_path)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_photo_index(folder):
+    """
+    Índice da pasta, criado (watchdog + varredura) uma única vez por processo
+    """
+    folder = os.path.abspath(folder)
+    with _indexes_lock:
+        index = _indexes.get(folder)
+        if index is None:
+            index = PhotoIndex(folder)
+            if os.path.isdir(folder):
+                # Observador antes da varredura: fotos criadas durante a
+                # varredura entram pelo watchdog (`add` ignora repetidas)
+                index.watch()
+                index.scan()
+                _indexes[folder] = index
+        return index
+
+
+class PhotoMap:
+    """
+    Mapeamento da aba Photos: (parede, tubo) → elevações ordenadas e caminhos.
+    `error` guarda o motivo de um mapa vazio por aba Photos inválida
+    """
+
+    def __init__(self, groups=None, error=None):
+        self._groups = groups or {}
+        self.error = error
+
+    def __len__(self):
+        return sum(elevations.size for elevations, _ in self._groups.values())
+
+    def lookup(self, wall, tube, elevation_m, tolerance=PHOTO_TOLERANCE_M):
+        """
+        Caminho da foto com elevação mais próxima, dentro da tolerância
+        """
+        group = self._groups.get((str(wall), str(tube)))
+        if group is None:
+            return None
+        elevations, paths = group
+        i = int(np.searchsorted(elevations, elevation_m))
+        best = None
+        for j in (i - 1, i):
+            if 0 <= j < elevations.size:
+                distance = abs(elevations[j] - elevation_m)
+                if distance <= tolerance and (best is None or distance < best[0]):
+                    best = (distance, paths[j])
+        return best[1] if best else None
+
+
+def _pick_column(columns, *names):
+    for name in names:
+        if name in columns:
+            return name
+    return None
+
+
+def _clean_text(series):
+    # Texto sem espaços; tubo numérico "17.0" vira "17" (rótulo do eixo X)
+    return series.astype(str).str.strip().str.replace(r"^(-?\d+)\.0+$", r"\1", regex=True)
+
+
+def build_photo_map(photos):
+    """
+    Monta o PhotoMap da aba Photos (operações vetorizadas do pandas).
+    ValueError se faltar alguma coluna obrigatória
+    """
+    if photos is None or photos.empty:
+        return PhotoMap()
+
+    df = photos.copy()
+    df.columns = [str(c).strip().lower() for c in df.columns]
+
+    col_wall = _pick_column(df.columns, "wall", "componente")
+    col_tube = _pick_column(df.columns, "tube", "tubo")
+    col_path = _pick_column(df.columns, "path", "arquivo")
+    col_elev_m = _pick_column(df.columns, "elevation_m")
+    col_elev_ft = _pick_column(df.columns, "elevation_ft")
+
+    missing = [
+        label for label, col in (
+            ("wall", col_wall), ("tube", col_tube), ("path", col_path),
+            ("elevation_m/elevation_ft", col_elev_m or col_elev_ft),
+        )
+        if col is None
+    ]
+    if missing:
+        raise ValueError(f"Aba Photos sem as colunas: {', '.join(missing)}")
+
+    elev_col = col_elev_m or col_elev_ft
+    elevation = pd.to_numeric(
+        df[elev_col].astype(str).str.replace(",", ".", regex=False), errors="coerce"
+    )
+    if col_elev_m is None:
+        elevation = elevation / FT_PER_M
+
+    frame = pd.DataFrame({
+        "wall": df[col_wall].astype(str).str.strip(),
+        "tube": _clean_text(df[col_tube]),
+        "elevation": elevation,
+        "path": df[col_path].astype(str).str.strip(),
+    })
+    frame = frame[frame["elevation"].notna()].sort_values(
+        ["wall", "tube", "elevation"], kind="stable"
+    )
+
+    elevations = frame["elevation"].to_numpy(dtype=float)
+    paths = frame["path"].to_numpy(dtype=object)
+    groups = {
+        key: (elevations[idx], paths[idx])
+        for key, idx in frame.groupby(["wall", "tube"], sort=False).indices.items()
+    }
+    return PhotoMap(groups)
+
+
+_photo_maps = LRUCache(maxsize=16)
+_photo_maps_lock = threading.Lock()
+
+
+def get_photo_map(inspection):
+    """
+    PhotoMap da aba Photos da inspeção, montado uma vez por arquivo (hash).
+    Aba Photos inválida vira um mapa vazio com a mensagem em `error` (também
+    guardado, para não remontar a cada clique)
+    """
+    with _photo_maps_lock:
+        photo_map = _photo_maps.get(inspection.hash)
+    if photo_map is None:
+        try:
+            photo_map = build_photo_map(inspection.photos)
+        except ValueError as e:
+            photo_map = PhotoMap(error=str(e))
+        with _photo_maps_lock:
+            _photo_maps[inspection.hash] = photo_map
+    return photo_map
@@ -0,0 +1,60 @@
+# src/profile_panel.py
+# type: ignore
+
+"""
+Script para o painel (opcional) com as etapas medidas do rerun
+"""
+
+import pandas as pd
+import streamlit as st
+
+from instrumentation import profiling_default, to_json_lines, to_prometheus
+
+
+def render_profile_panel(profile):
+    """
+    Caixa para ligar a medição e, se ligada, a tabela das etapas do rerun
+    atual com os botões de exportação
+    """
+    with st.sidebar:
+        enabled = st.checkbox(
+            "Medir etapas do rerun",
+            value=profiling_default(),
+            key="profile_enabled",
+            help=(
+                "Tempo e pico de memória de cada etapa (vale a partir do próximo rerun). "
+                "O pico é do processo: inclui outras sessões rodando ao mesmo tempo."
+            ),
+        )
+        if not enabled or profile is None:
+            return
+
+        records = profile.sorted_records()
+        frame = pd.DataFrame({
+            "Etapa": [" " * r.depth + r.stage for r in records],
+            "Tempo (ms)": [r.seconds * 1000 for r in records],
+            "Pico do processo (MB)": [
+                None if r.peak_bytes is None else r.peak_bytes / 1024 / 1024 for r in records
+            ],
+            "Extra": [", ".join(f"{k}={v}" for k, v in r.extra.items()) for r in records],
+        })
+        total = sum(r.seconds for r in records if r.depth == 0)
+
+        with st.expander(f"Etapas do rerun ({total * 1000:.0f} ms)".replace(".", ","), expanded=True):
+            st.dataframe(
+                frame,
+                hide_index=True,
+                column_config={
+                    "Tempo (ms)": st.column_config.NumberColumn(format="%.1f"),
+                    "Pico do processo (MB)": st.column_config.NumberColumn(format="%.2f"),
+                },
+            )
+            col_a, col_b = st.columns(2)
+            col_a.download_button(
+                "JSON lines", to_json_lines(profile), file_name="rerun.jsonl",
+                mime="application/x-ndjson",
+            )
+            col_b.download_button(
+                "Prometheus", to_prometheus(profile), file_name="rerun.prom",
+                mime="text/plain",
+            )
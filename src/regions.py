@@ -0,0 +1,235 @@
+# type: ignore
+
+"""
+Script para a detecção das regiões finas (células vizinhas abaixo de um
+limite de espessura) de um componente, sem dependência do Streamlit
+
+As células abaixo do limite são agrupadas por vizinhança de 4 (acima,
+abaixo, esquerda, direita) de forma vetorizada: cada linha do grid vira
+trechos contínuos, trechos sobrepostos em linhas vizinhas são ligados e os
+grupos saem de uma união-busca feita em lote com numpy
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+# Limite da faixa vermelha da escala de cores (mm)
+THIN_THRESHOLD_MM = 3.5
+
+# Regiões contornadas no heatmap (as primeiras do ranking)
+OUTLINE_MAX_REGIONS = 20
+OUTLINE_COLOR = "dodgerblue"
+
+
+@dataclass(frozen=True)
+class ThinRegions:
+    """
+    Regiões finas de um grid, já ordenadas pelo ranking (menor espessura
+    primeiro; nos empates, a maior área)
+    """
+
+    threshold: float
+    cells: np.ndarray
+    min_thickness: np.ndarray
+    mean_thickness: np.ndarray
+    row_min: np.ndarray
+    row_max: np.ndarray
+    col_min: np.ndarray
+    col_max: np.ndarray
+
+    def __len__(self):
+        return len(self.cells)
+
+    @property
+    def nbytes(self):
+        return int(sum(
+            a.nbytes for a in (
+                self.cells, self.min_thickness, self.mean_thickness,
+                self.row_min, self.row_max, self.col_min, self.col_max,
+            )
+        ))
+
+
+def _connect(n, a, b):
+    """
+    Raiz (menor índice) do grupo de cada um dos n itens, dadas as ligações
+    a[i] — b[i]. Liga raízes à menor delas e comprime os caminhos, em lote,
+    até todas as ligações ficarem dentro de um mesmo grupo
+    """
+    parent = np.arange(n, dtype=np.int64)
+    while a.size:
+        root_a, root_b = parent[a], parent[b]
+        open_links = root_a != root_b
+        if not open_links.any():
+            break
+        a, b = a[open_links], b[open_links]
+        root_a, root_b = root_a[open_links], root_b[open_links]
+        np.minimum.at(parent, np.maximum(root_a, root_b), np.minimum(root_a, root_b))
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+    return parent
+
+
+def _label_runs(mask):
+    """
+    Trechos contínuos (em cada linha) das células da máscara e a região de
+    cada trecho. Retorna (início dos trechos, trecho de cada célula, região
+    de cada trecho, número de regiões)
+    """
+    # Um trecho começa onde a célula à esquerda não está na máscara
+    starts = mask.copy()
+    starts[:, 1:] &= ~mask[:, :-1]
+    run_id = np.cumsum(starts, dtype=np.int64).reshape(mask.shape) - 1
+    n_runs = int(run_id[-1, -1]) + 1
+
+    # Ligações entre trechos de linhas vizinhas (uma por par de trechos)
+    vertical = mask[:-1] & mask[1:]
+    upper, lower = run_id[:-1][vertical], run_id[1:][vertical]
+    if upper.size:
+        new_pair = np.ones(upper.size, dtype=bool)
+        new_pair[1:] = (upper[1:] != upper[:-1]) | (lower[1:] != lower[:-1])
+        upper, lower = upper[new_pair], lower[new_pair]
+
+    roots = _connect(n_runs, upper, lower)
+    unique_roots, region_of_run = np.unique(roots, return_inverse=True)
+    return starts, run_id, region_of_run, len(unique_roots)
+
+
+def _thin_mask(values, threshold):
+    with np.errstate(invalid="ignore"):
+        return values < threshold
+
+
+def label_regions(values, threshold=THIN_THRESHOLD_MM):
+    """
+    Rótulo da região de cada célula (-1 fora das regiões) e o número de
+    regiões. Regiões numeradas pela primeira célula (linha a linha)
+    """
+    mask = _thin_mask(values, threshold)
+    if not mask.any():
+        return np.full(mask.shape, -1, dtype=np.int64), 0
+    _, run_id, region_of_run, count = _label_runs(mask)
+    return np.where(mask, region_of_run[run_id], -1), count
+
+
+def find_regions(values, threshold=THIN_THRESHOLD_MM, min_cells=1):
+    """
+    Estatísticas das regiões finas (área em células, menor e média
+    espessura, faixa de linhas e colunas), em ordem de ranking
+    """
+    mask = _thin_mask(values, threshold)
+    if not mask.any():
+        empty = np.empty(0, dtype=np.int64)
+        return ThinRegions(
+            float(threshold), empty, np.empty(0), np.empty(0), empty, empty, empty, empty
+        )
+    starts, _, region_of_run, count = _label_runs(mask)
+
+    # Estatísticas por trecho (células de um trecho são contíguas na ordem
+    # linha a linha) e depois por região: poucos trechos, muitas células
+    cells = np.flatnonzero(mask)
+    readings = values.ravel()[cells]
+    first = np.flatnonzero(starts.ravel()[cells])
+    length = np.diff(first, append=cells.size)
+    run_row, run_col = np.divmod(cells[first], values.shape[1])
+    run_min = np.minimum.reduceat(readings, first).astype(np.float64)
+    run_sum = np.add.reduceat(readings, first, dtype=np.float64)
+
+    area = np.bincount(region_of_run, weights=length, minlength=count).astype(np.int64)
+    mean = np.bincount(region_of_run, weights=run_sum, minlength=count) / area
+    minimum = np.full(count, np.inf)
+    np.minimum.at(minimum, region_of_run, run_min)
+    row_min = np.full(count, values.shape[0], dtype=np.int64)
+    np.minimum.at(row_min, region_of_run, run_row)
+    row_max = np.zeros(count, dtype=np.int64)
+    np.maximum.at(row_max, region_of_run, run_row)
+    col_min = np.full(count, values.shape[1], dtype=np.int64)
+    np.minimum.at(col_min, region_of_run, run_col)
+    col_max = np.zeros(count, dtype=np.int64)
+    np.maximum.at(col_max, region_of_run, run_col + length - 1)
+
+    keep = np.flatnonzero(area >= min_cells)
+    ranking = keep[np.lexsort((-area[keep], minimum[keep]))]
+    return ThinRegions(
+        threshold=float(threshold),
+        cells=area[ranking],
+        min_thickness=minimum[ranking],
+        mean_thickness=mean[ranking],
+        row_min=row_min[ranking],
+        row_max=row_max[ranking],
+        col_min=col_min[ranking],
+        col_max=col_max[ranking],
+    )
+
+
+def regions_frame(regions, elevations, tubes):
+    """
+    Uma linha por região, na ordem do ranking
+    """
+    elevations = np.asarray(elevations, dtype=float)
+    tubes = np.asarray([str(t) for t in tubes], dtype=object)
+    low = np.minimum(elevations[regions.row_min], elevations[regions.row_max])
+    high = np.maximum(elevations[regions.row_min], elevations[regions.row_max])
+    return pd.DataFrame({
+        "rank": np.arange(1, len(regions) + 1),
+        "cells": regions.cells,
+        "min_thickness": regions.min_thickness,
+        "mean_thickness": regions.mean_thickness,
+        "first_tube": tubes[regions.col_min],
+        "last_tube": tubes[regions.col_max],
+        "tube_count": regions.col_max - regions.col_min + 1,
+        "min_elevation": low,
+        "max_elevation": high,
+    })
+
+
+def _row_bounds(elevations):
+    # Limites (inferior/superior) de cada linha: metade da distância até as
+    # linhas vizinhas
+    if elevations.size < 2:
+        return elevations - 0.5, elevations + 0.5
+    middle = (elevations[1:] + elevations[:-1]) / 2
+    before = np.concatenate(([2 * elevations[0] - middle[0]], middle))
+    after = np.concatenate((middle, [2 * elevations[-1] - middle[-1]]))
+    return np.minimum(before, after), np.maximum(before, after)
+
+
+def region_shapes(regions, elevations, row_range=None, col_range=None, level=0,
+                  max_regions=OUTLINE_MAX_REGIONS):
+    """
+    Retângulos (shapes do Plotly) em volta das primeiras regiões do ranking
+    que aparecem na janela [r0, r1) × [c0, c1) do heatmap. O X é a posição
+    da coluna no eixo categórico (blocos de 2**level colunas na visão
+    reduzida); o Y, a elevação em metros
+    """
+    elevations = np.asarray(elevations, dtype=float)
+    r0, r1 = row_range or (0, elevations.size)
+    c0, c1 = col_range or (0, int(regions.col_max.max(initial=-1)) + 1)
+    factor = 2 ** level
+    low, high = _row_bounds(elevations)
+
+    shapes = []
+    for rank in range(min(len(regions), max_regions)):
+        rows = (max(int(regions.row_min[rank]), r0), min(int(regions.row_max[rank]), r1 - 1))
+        cols = (max(int(regions.col_min[rank]), c0), min(int(regions.col_max[rank]), c1 - 1))
+        if rows[0] > rows[1] or cols[0] > cols[1]:
+            continue
+        shapes.append(dict(
+            type="rect",
+            xref="x",
+            yref="y",
+            x0=cols[0] // factor - c0 // factor - 0.5,
+            x1=cols[1] // factor - c0 // factor + 0.5,
+            y0=float(low[rows[0]:rows[1] + 1].min()),
+            y1=float(high[rows[0]:rows[1] + 1].max()),
+            line=dict(color=OUTLINE_COLOR, width=2),
+            fillcolor="rgba(0,0,0,0)",
+            label=dict(text=f"#{rank + 1}", textposition="top left",
+                       font=dict(color=OUTLINE_COLOR, size=11)),
+        ))
+    return shapes
@@ -0,0 +1,131 @@
+# type: ignore
+
+"""
+Script para converter cliques e seleções (caixa/laço) do heatmap em células
+do grid, usando o índice ordenado de elevações e o mapa tubo → coluna
+
+As posições numéricas do eixo X (caixa/laço) são relativas ao gráfico
+exibido: numa janela [r0, r1) × [c0, c1) do grid, a posição 0 é a coluna c0
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _window(grid, row_range, col_range):
+    r0, r1 = row_range or (0, len(grid.elevations))
+    c0, c1 = col_range or (0, len(grid.tubes))
+    return (r0, r1), (c0, c1)
+
+
+def _category_positions(grid, values, offset=0):
+    # Eixo X categórico: posições numéricas (no gráfico exibido, que começa
+    # na coluna `offset`) ou rótulos dos tubos; retorna colunas do grid
+    positions = []
+    for value in values:
+        if isinstance(value, str):
+            positions.append(grid.tube_positions.get(value, np.nan))
+        else:
+            positions.append(float(value) + offset)
+    return np.asarray(positions, dtype=float)
+
+
+def resolve_points(grid, points):
+    """
+    Células (linhas, colunas) dos pontos clicados ({"x": tubo, "y": elevação})
+    """
+    tubes = [str(point.get("x")) for point in points]
+    elevations = [float(point.get("y")) for point in points]
+    rows, cols = grid.locate(tubes, elevations)
+    keep = cols >= 0
+    return rows[keep], cols[keep]
+
+
+def _cells_in_columns(grid, x0, x1, y_range, row_range, col_range):
+    # Caixa já em colunas do grid, limitada à janela exibida
+    (r0, r1), (c0, c1) = _window(grid, row_range, col_range)
+    cols = np.arange(max(int(np.ceil(x0)), c0), min(int(np.floor(x1)), c1 - 1) + 1)
+    rows = grid.rows_between(*y_range)
+    rows = rows[(rows >= r0) & (rows < r1)]
+    if cols.size == 0 or rows.size == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    rr, cc = np.meshgrid(rows, cols, indexing="ij")
+    return rr.ravel(), cc.ravel()
+
+
+def cells_in_box(grid, x_range, y_range, row_range=None, col_range=None):
+    """
+    Células cujo centro está dentro da caixa (x em posições de categoria
+    do gráfico exibido, y em metros)
+    """
+    _, (c0, _) = _window(grid, row_range, col_range)
+    x0, x1 = np.sort(_category_positions(grid, x_range, c0))
+    return _cells_in_columns(grid, x0, x1, y_range, row_range, col_range)
+
+
+def cells_in_lasso(grid, xs, ys, row_range=None, col_range=None):
+    """
+    Células cujo centro está dentro do polígono do laço
+    """
+    _, (c0, _) = _window(grid, row_range, col_range)
+    px = _category_positions(grid, xs, c0)
+    py = np.asarray(ys, dtype=float)
+    rows, cols = _cells_in_columns(
+        grid, px.min(), px.max(), (py.min(), py.max()), row_range, col_range
+    )
+    if rows.size == 0:
+        return rows, cols
+
+    x = cols.astype(float)
+    y = grid.elevations[rows]
+    inside = np.zeros(rows.size, dtype=bool)
+    # Regra par-ímpar, vetorizada sobre as células candidatas
+    for xi, yi, xj, yj in zip(px, py, np.roll(px, 1), np.roll(py, 1)):
+        if yi == yj:
+            continue
+        crosses = (yi > y) != (yj > y)
+        inside ^= crosses & (x < (xj - xi) * (y - yi) / (yj - yi) + xi)
+    return rows[inside], cols[inside]
+
+
+def selection_cells(grid, selection, row_range=None, col_range=None):
+    """
+    Todas as células de um evento de seleção do st.plotly_chart (pontos,
+    caixas e laços), sem repetição. `row_range`/`col_range` é a janela do
+    grid exibida no gráfico
+    """
+    rows, cols = [], []
+
+    r, c = resolve_points(grid, selection.get("points", []))
+    rows.append(r)
+    cols.append(c)
+    for box in selection.get("box", []):
+        r, c = cells_in_box(grid, box["x"], box["y"], row_range, col_range)
+        rows.append(r)
+        cols.append(c)
+    for lasso in selection.get("lasso", []):
+        r, c = cells_in_lasso(grid, lasso["x"], lasso["y"], row_range, col_range)
+        rows.append(r)
+        cols.append(c)
+
+    rows = np.concatenate(rows).astype(np.intp)
+    cols = np.concatenate(cols).astype(np.intp)
+    if rows.size == 0:
+        return rows, cols
+    flat = np.unique(rows * len(grid.tubes) + cols)
+    return np.divmod(flat, len(grid.tubes))
+
+
+def cells_frame(grid, values, rows, cols):
+    """
+    Tabela das células selecionadas (tubo, elevação e espessura ajustada)
+    """
+    return pd.DataFrame(
+        {
+            "tube": np.asarray(grid.tubes, dtype=object)[cols] if len(grid.tubes) else [],
+            "elevation": grid.elevations[rows],
+            "thickness": values[rows, cols],
+            "row": rows,
+            "col": cols,
+        }
+    )
@@ -4,164 +4,159 @@
 """
 Script para geração do sumário e dados gerais relacionados às paredes de tubos
 da caldeira
+
+O sumário é calculado em uma thread de fundo, iniciada quando o arquivo é
+carregado, e guardado por inspeção (hash) e abas. Enquanto não termina, a
+página mostra o progresso em um fragmento que se atualiza sozinho; os
+reruns do mapa de calor não esperam nem refazem o cálculo
 """
 
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-import pandas as pd
 import streamlit as st
+from cachetools import LRUCache
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+from summary_engine import summarize_inspection
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+)
+
+# Intervalo (s) entre as atualizações do progresso na página
+SUMMARY_POLL_SECONDS = 0.5
+
+# Um cálculo de cada vez (o cálculo em si já usa o pool de processos)
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sumario")
+
+# Cálculos iniciados (e HTML pronto), por (hash, abas)
+_jobs = LRUCache(maxsize=32)
+_jobs_lock = threading.Lock()
+
+
+class SummaryJob:
+    """
+    Cálculo do sumário de uma inspeção em segundo plano
+    """
+
+    def __init__(self, total):
+        self.done = 0
+        self.total = total
+        self.seconds = None
+        self.future = None
 
+    def _progress(self, done, total):
+        self.done, self.total = done, total
 
-def generate_summary(uploaded_file, sheets):
+    @property
+    def fraction(self):
+        return self.done / self.total if self.total else 0.0
+
+    def ready(self):
+        return self.future is not None and self.future.done()
+
+
+def _sheet_context(stats):
+    """
+    Textos exibidos no cartão de um componente (vírgula decimal)
+    """
+    rows = [
+        {
+            "min_reading": f"{reading.thickness:.3f} mm".replace(".", ","),
+            "tube": f"#{reading.tube}",
+            "elevation": f"{reading.elevation:.3f} m".replace(".", ",")
+            if np.isfinite(reading.elevation)
+            else "-",
+        }
+        for reading in stats.min_readings
+    ]
+    return {
+        "name": stats.name,
+        "tubes_range": f"{stats.first_tube} - {stats.last_tube}",
+        "elevation_range": (
+            f"{stats.min_elevation:.3f} m - {stats.max_elevation:.3f} m"
+        ).replace(".", ","),
+        "avg_thickness": f"{stats.avg_thickness:.3f}".replace(".", ",") + " mm",
+        "rows": rows,
+    }
+
+
+def render_summary_html(summaries):
+    """
+    Um único fragmento HTML (CSS compartilhado) com um cartão por componente
+    """
+    sheets = [_sheet_context(stats) for stats in summaries if stats is not None]
+    return _env.get_template("summary.html").render(sheets=sheets)
+
+
+def _compute(inspection, sheets, job):
+    start = time.perf_counter()
+    summaries = summarize_inspection(inspection, sheets, progress=job._progress)
+    html = render_summary_html(summaries)
+    job.seconds = time.perf_counter() - start
+    return html
+
+
+def start_summary(inspection, sheets):
+    """
+    Inicia (se ainda não iniciado) o cálculo do sumário em segundo plano e
+    retorna o `SummaryJob`
+    """
+    sheets = tuple(sheets)
+    key = (inspection.hash, sheets)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is None:
+            job = SummaryJob(len(sheets))
+            job.future = _executor.submit(_compute, inspection, sheets, job)
+            _jobs[key] = job
+    return job
+
+
+def _discard_job(key, job):
+    with _jobs_lock:
+        if _jobs.get(key) is job:
+            del _jobs[key]
+
+
+@st.fragment(run_every=SUMMARY_POLL_SECONDS)
+def _summary_progress(key):
+    # Só este fragmento é refeito enquanto o cálculo não termina
+    with _jobs_lock:
+        job = _jobs.get(key)
+    if job is None or job.ready():
+        # Pronto: um rerun completo troca o progresso pelo sumário
+        st.rerun()
+    st.progress(
+        job.fraction,
+        text=f"Calculando o sumário... {job.done} de {job.total} componentes",
+    )
+
+
+def generate_summary(inspection, sheets):
     """
-    Gera o sumário com informações gerais sobre a inspeção
+    Gera o sumário com informações gerais sobre a inspeção (ou o progresso,
+    se o cálculo ainda não terminou)
     """
-    for sheet in sheets:
-        summarize = pd.read_excel(uploaded_file, sheet)
-
-        # Mantém o mesmo corte que você já usava
-        summarize = summarize.iloc[3:].reset_index(drop=True)
-
-        # 1ª coluna = elevação (m). Garantir que seja numérica.
-        elev = pd.to_numeric(
-            summarize.iloc[:, 0].astype(str).str.replace(",", ".", regex=False),
-            errors="coerce",
-        )
-
-        # Remove linhas sem elevação válida
-        summarize = summarize.loc[elev.notna()].copy()
-        elev = elev.loc[elev.notna()].astype(float)
-
-        if summarize.empty:
-            # não tenta formatar nada
-            continue
-
-        # Define elevação como índice
-        summarize.iloc[:, 0] = elev.values
-        summarize.set_index(summarize.columns[0], inplace=True)
-
-        # Converte leituras para numérico
-        summarize = summarize.apply(pd.to_numeric, errors="coerce")
-
-        # Range de elevação (robusto)
-        summarize_min_elevation = float(np.nanmin(summarize.index.values))
-        summarize_max_elevation = float(np.nanmax(summarize.index.values))
-
-        # Estatísticas usando TODAS as colunas (tubos)
-        avg_thickness_val = float(np.nanmean(summarize.values))
-        min_thickness = summarize.min().nsmallest(3)
-
-        tubes_range = f"{summarize.columns[0]} - {summarize.columns[-1]}"
-        elevation_range = (
-            f"{summarize_min_elevation:.3f} m - {summarize_max_elevation:.3f} m"
-        ).replace(".", ",")
-        avg_thickness = (f"{avg_thickness_val:.3f}".replace(".", ",") + " mm")
-
-        data = []
-        for tube_col in min_thickness.index:
-            thickness_value = float(min_thickness[tube_col])
-
-            matches = summarize.index[summarize[tube_col] == thickness_value]
-            elev_value = float(matches[0]) if len(matches) else float("nan")
-
-            data.append(
-                {
-                    "min_reading": f"{thickness_value:.3f} mm".replace(".", ","),
-                    "tube": f"#{tube_col}",
-                    "elevation": f"{elev_value:.3f} m".replace(".", ",")
-                    if np.isfinite(elev_value)
-                    else "-",
-                }
-            )
-
-        html_content = f"""
-        <!DOCTYPE html>
-        <html lang="pt-BR">
-        <head>
-            <meta charset="UTF-8">
-            <meta name="viewport" content="width=device-width, initial-scale=1.0">
-            <style>
-                body {{
-                    font-family: Arial, sans-serif;
-                    color: #fff;
-                    justify-content: center;
-                    align-items: center;
-                }}
-                .container {{
-                    width: 400px;
-                    background-color: #1e1e1e;
-                    padding: 20px;
-                    border-radius: 8px;
-                    box-shadow: 0px 4px 8px rgba(0, 0, 0, 0.5);
-                }}
-                .container h1 {{
-                    font-size: 24px;
-                    margin-bottom: 10px;
-                }}
-                .data {{
-                    font-size: 14px;
-                    line-height: 1.6;
-                }}
-                .data strong {{
-                    font-size: 16px;
-                }}
-                .table {{
-                    width: 100%;
-                    border-collapse: collapse;
-                    margin-top: 20px;
-                }}
-                .table th, .table td {{
-                    padding: 8px;
-                    text-align: left;
-                }}
-                .table th {{
-                    font-weight: normal;
-                    color: #aaa;
-                }}
-                .table td {{
-                    font-weight: bold;
-                }}
-                .table tr:nth-child(odd) {{
-                    background-color: #2a2a2a;
-                }}
-                .table tr:nth-child(even) {{
-                    background-color: #1e1e1e;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <h1>{sheet}</h1>
-                <div class="data">
-                    Tubos: <strong>#{tubes_range}</strong><br>
-                    Elevação: <strong>{elevation_range}</strong><br>
-                    Espessura média: <strong>{avg_thickness}</strong>
-                </div>
-                <table class="table">
-                    <thead>
-                        <tr>
-                            <th>Espessuras mínimas</th>
-                            <th>Tubos</th>
-                            <th>Elevação</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-        """
-
-        for row in data:
-            html_content += f"""
-            <tr>
-                <td>{row['min_reading']}</td>
-                <td>{row['tube']}</td>
-                <td>{row['elevation']}</td>
-            </tr>
-            """
-
-        html_content += """
-                    </tbody>
-                </table>
-            </div>
-        </body>
-        </html>
-        """
-
-        st.components.v1.html(html_content, height=350, width=500)
\ No newline at end of file
+    job = start_summary(inspection, sheets)
+    key = (inspection.hash, tuple(sheets))
+    if not job.ready():
+        _summary_progress(key)
+        return
+
+    try:
+        html = job.future.result()
+    except Exception as e:  # noqa: BLE001 - exibido; o próximo rerun tenta de novo
+        _discard_job(key, job)
+        st.error(f"Erro ao calcular o sumário: {e}")
+        return
+    st.html(html)
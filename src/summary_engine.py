@@ -0,0 +1,210 @@
+# type: ignore
+
+"""
+Script com o cálculo das estatísticas do sumário (separado da exibição),
+em paralelo por componente
+"""
+
+import threading
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+from cachetools import LRUCache
+
+from parallel import map_as_completed, map_ordered
+
+# Abaixo deste total de leituras o sumário é calculado em série
+PARALLEL_MIN_READINGS = 2_000_000
+
+
+@dataclass(frozen=True)
+class MinReading:
+    """
+    Uma das menores leituras do componente, com sua posição no grid
+    """
+
+    thickness: float
+    tube: str
+    elevation: float
+    row: int
+    col: int
+
+
+@dataclass(frozen=True)
+class SheetSummary:
+    """
+    Estatísticas gerais de um componente
+    """
+
+    name: str
+    first_tube: str
+    last_tube: str
+    min_elevation: float
+    max_elevation: float
+    avg_thickness: float
+    readings: int
+    min_readings: tuple
+
+
+_cache = LRUCache(maxsize=32)
+_cache_lock = threading.Lock()
+
+
+def smallest_cells(values, k=3, per_tube=True):
+    """
+    Posições (linha, coluna) das k menores leituras, em ordem crescente.
+    Com `per_tube=True` considera só a menor leitura de cada tubo (k tubos
+    distintos); caso contrário, as k menores células do grid
+    """
+    if values.size == 0 or k <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    filled = np.where(np.isnan(values), np.inf, values)
+
+    if per_tube:
+        rows = filled.argmin(axis=0)
+        candidates = filled[rows, np.arange(filled.shape[1])]
+    else:
+        candidates = filled.ravel()
+
+    valid = np.flatnonzero(np.isfinite(candidates))
+    if valid.size > k:
+        # k-ésimo menor valor em O(n); nos empates vale a primeira posição
+        kth = np.partition(candidates[valid], k - 1)[k - 1]
+        below = valid[candidates[valid] < kth]
+        ties = valid[candidates[valid] == kth][: k - below.size]
+        valid = np.concatenate([below, ties])
+    # Ordena pelo valor; empates ficam na ordem das colunas/células
+    valid.sort()
+    order = valid[np.argsort(candidates[valid], kind="stable")]
+
+    if per_tube:
+        return rows[order], order
+    return np.divmod(order, filled.shape[1])
+
+
+def summarize_sheet(grid, k=3, per_tube=True):
+    """
+    Calcula as estatísticas de um componente (None se não houver leituras)
+    """
+    if grid.empty:
+        return None
+
+    values = grid.values
+    finite = np.isfinite(values)
+    readings = int(finite.sum())
+    avg = float(values[finite].mean(dtype=np.float64)) if readings else float("nan")
+
+    rows, cols = smallest_cells(values, k, per_tube)
+    # Leituras em float32: str() devolve o valor digitado (6.123, não 6.1230001449)
+    min_readings = tuple(
+        MinReading(
+            float(str(values[r, c])), str(grid.tubes[c]), float(grid.elevations[r]), int(r), int(c)
+        )
+        for r, c in zip(rows, cols)
+    )
+
+    return SheetSummary(
+        name=grid.name,
+        first_tube=str(grid.tubes[0]),
+        last_tube=str(grid.tubes[-1]),
+        min_elevation=float(np.nanmin(grid.elevations)),
+        max_elevation=float(np.nanmax(grid.elevations)),
+        avg_thickness=avg,
+        readings=readings,
+        min_readings=min_readings,
+    )
+
+
+def _summarize_task(args):
+    return summarize_sheet(*args)
+
+
+def summarize_sheets(grids, k=3, per_tube=True, max_workers=None, parallel=None,
+                     progress=None):
+    """
+    Calcula as estatísticas de vários componentes, na ordem recebida.
+    `progress(feitos, total)` é chamado a cada componente concluído
+    """
+    grids = list(grids)
+    if parallel is None:
+        parallel = sum(grid.values.size for grid in grids) >= PARALLEL_MIN_READINGS
+    tasks = [(grid, k, per_tube) for grid in grids]
+    if progress is None:
+        return map_ordered(_summarize_task, tasks, max_workers, parallel)
+
+    results = [None] * len(tasks)
+    progress(0, len(tasks))
+    for done, (i, result) in enumerate(
+        map_as_completed(_summarize_task, tasks, max_workers, parallel), start=1
+    ):
+        results[i] = result
+        progress(done, len(tasks))
+    return results
+
+
+def summarize_inspection(inspection, sheets=None, k=3, per_tube=True, max_workers=None,
+                         progress=None):
+    """
+    Estatísticas das abas da inspeção (resultado guardado por hash)
+    """
+    sheets = tuple(inspection.sheet_names if sheets is None else sheets)
+    key = (inspection.hash, sheets, k, per_tube)
+
+    with _cache_lock:
+        result = _cache.get(key)
+    if result is None:
+        result = summarize_sheets(
+            [inspection.sheets[name] for name in sheets], k, per_tube, max_workers,
+            progress=progress,
+        )
+        with _cache_lock:
+            _cache[key] = result
+    return result
+
+
+def summary_frame(summaries):
+    """
+    Uma linha por componente com as estatísticas gerais
+    """
+    rows = [
+        {
+            "sheet": s.name,
+            "first_tube": s.first_tube,
+            "last_tube": s.last_tube,
+            "min_elevation": s.min_elevation,
+            "max_elevation": s.max_elevation,
+            "avg_thickness": s.avg_thickness,
+            "readings": s.readings,
+        }
+        for s in summaries
+        if s is not None
+    ]
+    return pd.DataFrame(rows, columns=[
+        "sheet", "first_tube", "last_tube", "min_elevation", "max_elevation",
+        "avg_thickness", "readings",
+    ])
+
+
+def min_readings_frame(summaries):
+    """
+    Uma linha por menor leitura (componente, posição, tubo, elevação e valor)
+    """
+    rows = [
+        {"sheet": s.name, "rank": rank, **asdict(reading)}
+        for s in summaries
+        if s is not None
+        for rank, reading in enumerate(s.min_readings, start=1)
+    ]
+    return pd.DataFrame(rows, columns=[
+        "sheet", "rank", "thickness", "tube", "elevation", "row", "col",
+    ])
+
+
+def thinnest_readings(summaries, k=3):
+    """
+    As k menores leituras entre todos os componentes
+    """
+    frame = min_readings_frame(summaries)
+    return frame.sort_values("thickness", kind="stable").head(k).reset_index(drop=True)
@@ -0,0 +1,137 @@
+# type: ignore
+
+"""
+Script para as miniaturas das fotos de inspeção (Pillow)
+
+As fotos originais (JPEGs de câmera com 10+ MB) são reduzidas para o tamanho
+de tela uma única vez e guardadas em disco, com chave = caminho + mtime +
+tamanho do arquivo. As fotos dos pontos vizinhos são preparadas em segundo
+plano para que navegar entre células adjacentes seja imediato
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageOps
+
+THUMB_DIR = ".cache/miniaturas"
+THUMB_SIZE = (1280, 1280)
+THUMB_QUALITY = 85
+
+# Limite do cache em disco; a limpeza remove as miniaturas usadas há mais tempo
+THUMB_CACHE_MAX_BYTES = 512 * 1024 * 1024
+# A limpeza roda a cada N miniaturas geradas
+_EVICT_EVERY = 50
+
+PREFETCH_WORKERS = 2
+
+_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="miniaturas")
+_pending = set()
+_lock = threading.Lock()
+_written = 0
+
+
+def _thumbnail_file(path, stat, folder):
+    key = f"{os.path.abspath(path)}|{stat.st_mtime_ns}|{stat.st_size}"
+    return os.path.join(folder, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".jpg")
+
+
+def _render(path, target):
+    with Image.open(path) as image:
+        # JPEG: decodifica já reduzido (bem mais rápido que abrir em tamanho total)
+        image.draft("RGB", THUMB_SIZE)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(THUMB_SIZE)
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+
+        fd, tmp = tempfile.mkstemp(suffix=".jpg", dir=os.path.dirname(target))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                image.save(file, "JPEG", quality=THUMB_QUALITY, optimize=True)
+            os.replace(tmp, target)
+        except BaseException:
+            os.remove(tmp)
+            raise
+
+
+def get_thumbnail(path, folder=THUMB_DIR):
+    """
+    Caminho da miniatura da foto (gerada na primeira vez)
+    """
+    global _written
+
+    stat = os.stat(path)
+    target = _thumbnail_file(path, stat, folder)
+    if os.path.exists(target):
+        # mtime marca o último uso (base da limpeza LRU)
+        os.utime(target)
+        return target
+
+    os.makedirs(folder, exist_ok=True)
+    _render(path, target)
+
+    with _lock:
+        _written += 1
+        evict_now = _written % _EVICT_EVERY == 0
+    if evict_now:
+        evict(folder)
+    return target
+
+
+def evict(folder=THUMB_DIR, max_bytes=THUMB_CACHE_MAX_BYTES):
+    """
+    Remove as miniaturas usadas há mais tempo até o cache caber no limite
+    """
+    try:
+        entries = list(os.scandir(folder))
+    except FileNotFoundError:
+        return
+
+    files = []
+    for entry in entries:
+        try:
+            if entry.is_file():
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        except FileNotFoundError:
+            continue
+    files.sort()
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in files:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except FileNotFoundError:
+            pass
+
+
+def _prefetch_one(path, folder):
+    try:
+        get_thumbnail(path, folder)
+    except (OSError, ValueError):
+        # Foto inexistente ou corrompida: será tratada quando for exibida
+        pass
+    finally:
+        with _lock:
+            _pending.discard(path)
+
+
+def prefetch(paths, folder=THUMB_DIR):
+    """
+    Gera em segundo plano as miniaturas das fotos informadas
+    """
+    for path in paths:
+        if not path:
+            continue
+        with _lock:
+            if path in _pending:
+                continue
+            _pending.add(path)
+        _executor.submit(_prefetch_one, path, folder)
@@ -0,0 +1,104 @@
+# type: ignore
+
+"""
+Script para a visão planificada da caldeira: todos os componentes lado a
+lado em um único grid (eixo de elevações comum), separados por uma coluna
+vazia
+"""
+
+import numpy as np
+
+from inspection import SheetGrid, cached_derived
+
+ALL_COMPONENTS = "Todos os componentes"
+
+# Rótulo das colunas: "{parede}:{tubo}" (nome de aba do Excel não tem ":")
+LABEL_SEPARATOR = ":"
+
+# Elevações (m) de componentes diferentes a até esta distância viram a mesma
+# linha da visão planificada
+ELEVATION_TOLERANCE_M = 0.05
+
+
+def column_label(wall, tube):
+    return f"{wall}{LABEL_SEPARATOR}{tube}"
+
+
+def split_label(label):
+    """
+    (parede, tubo) de uma coluna da visão planificada; (None, None) para as
+    colunas separadoras
+    """
+    wall, sep, tube = str(label).partition(LABEL_SEPARATOR)
+    if not sep:
+        return None, None
+    return wall, tube
+
+
+def shared_elevations(elevations, tolerance=ELEVATION_TOLERANCE_M):
+    """
+    Agrupa as elevações (de todos os componentes) em linhas comuns: cada
+    grupo cobre no máximo `tolerance` m a partir da menor elevação e fica na
+    média das elevações distintas do grupo. Retorna (elevações comuns, linha
+    de cada elevação recebida)
+    """
+    distinct, inverse = np.unique(elevations, return_inverse=True)
+    group = np.empty(distinct.size, dtype=np.intp)
+    current, first = -1, -np.inf
+    # Laço sobre as elevações distintas (poucos milhares): grupos com largura
+    # limitada, sem encadear linhas próximas umas das outras
+    for i, elevation in enumerate(distinct):
+        if elevation - first > tolerance:
+            current, first = current + 1, elevation
+        group[i] = current
+    counts = np.bincount(group)
+    shared = np.bincount(group, weights=distinct) / counts
+    return shared, group[inverse]
+
+
+def unwrap_grids(grids, tolerance=ELEVATION_TOLERANCE_M):
+    """
+    Junta os grids lado a lado sobre um eixo de elevações comum (ver
+    `shared_elevations`), uma coluna vazia entre componentes. Leituras que
+    caem na mesma célula ficam com a menor (lado conservador da espessura)
+    """
+    grids = [grid for grid in grids if not grid.empty]
+    if not grids:
+        return SheetGrid(ALL_COMPONENTS, np.empty(0), (), np.empty((0, 0)))
+
+    elevations, rows_all = shared_elevations(
+        np.concatenate([grid.elevations for grid in grids]), tolerance
+    )
+    offsets = np.cumsum([0] + [len(grid.elevations) for grid in grids])
+
+    n_cols = sum(len(grid.tubes) for grid in grids) + len(grids) - 1
+    values = np.full((elevations.size, n_cols), np.nan, dtype=np.float32)
+    tubes = []
+    start = 0
+    for i, grid in enumerate(grids):
+        if i:
+            # Separador: rótulo único e sem ":" (só espaços)
+            tubes.append(" " * i)
+            start += 1
+        rows = rows_all[offsets[i]:offsets[i + 1]]
+        block = values[:, start:start + len(grid.tubes)]
+        if np.unique(rows).size == rows.size:
+            block[rows] = grid.values
+        else:
+            # Linhas do componente na mesma elevação comum: fica a menor
+            np.fmin.at(block, rows, grid.values)
+        tubes.extend(column_label(grid.name, tube) for tube in grid.tubes)
+        start += len(grid.tubes)
+
+    return SheetGrid(ALL_COMPONENTS, elevations, tuple(tubes), values)
+
+
+def unwrapped_grid(inspection, sheets):
+    """
+    Visão planificada das abas escolhidas, montada uma vez por (hash, abas)
+    e compartilhada entre as sessões
+    """
+    return cached_derived(
+        (inspection.hash, "unwrap", tuple(sheets)),
+        lambda: unwrap_grids([inspection.sheets[name] for name in sheets]),
+    )
@@ -7,83 +7,191 @@ Script para a geração do gráfico e visualização dos dados
 """
 
 import os
+from dataclasses import dataclass
+
 import numpy as np
 import pandas as pd
-import plotly.graph_objects as go
 import streamlit as st
-from streamlit_plotly_events import plotly_events
 
+from adjustments import Adjustment, adjusted_extent, count_in_range
+from heatmap import PayloadSizes, build_heatmap_figure, build_layer_figure, heatmap_z
+from history import LIFE_CAP_YEARS, MIN_THICKNESS_MM, aligned_history, remaining_life
+from inspection import cached_derived, readonly
+from instrumentation import stage
+from library import list_inspections, open_inspection, optional_text
+from lod import LOD_MAX_CELLS, Pyramid, index_window
+from photo_index import get_photo_index, get_photo_map
+from regions import (
+    OUTLINE_MAX_REGIONS, THIN_THRESHOLD_MM, find_regions, region_shapes, regions_frame,
+)
+from selection import cells_frame, selection_cells
+from thumbnails import get_thumbnail, prefetch
+from unwrap import ALL_COMPONENTS, split_label, unwrapped_grid
+
+# Linhas exibidas na tabela de uma seleção por caixa/laço
+SELECTION_TABLE_ROWS = 200
+
+# Linhas exibidas no ranking das regiões finas
+REGIONS_TABLE_ROWS = 200
+
+# Camadas do heatmap (as duas últimas exigem inspeções anteriores)
+LAYER_THICKNESS = "Espessura (mm)"
+LAYER_RATE = "Taxa de corrosão (mm/ano)"
+LAYER_LIFE = "Vida remanescente (anos)"
+LAYERS = (LAYER_THICKNESS, LAYER_RATE, LAYER_LIFE)
 
-def _build_image_map(uploaded_file, sheet_name="Photos"):
-    try:
-        xls = pd.ExcelFile(uploaded_file)
-        if sheet_name not in xls.sheet_names:
-            return {}
 
-        df = pd.read_excel(uploaded_file, sheet_name)
-        df.columns = [str(c).strip().lower() for c in df.columns]
+def _guess_image_path(base_folder, wall, tube, elev_m):
+    return get_photo_index(base_folder).lookup(wall, tube, elev_m)
+
+
+def _photo_path(photo_map, image_folder, wall, tube, elev_m):
+    img_path = photo_map.lookup(wall, tube, elev_m)
+    if img_path:
+        return img_path
+    return _guess_image_path(image_folder, str(wall), str(tube), elev_m)
+
+
+def _history_candidates(inspection):
+    # Inspeções da biblioteca da mesma caldeira (empresa + local), com data
+    if inspection.date is None:
+        return []
+    return [
+        entry for entry in list_inspections()
+        if entry.hash != inspection.hash
+        and entry.date is not None
+        and entry.company == optional_text(inspection.company)
+        and entry.site == optional_text(inspection.site)
+    ]
 
-        col_wall = "wall" if "wall" in df.columns else (
-            "componente" if "componente" in df.columns else None
-        )
-        col_tube = "tube" if "tube" in df.columns else (
-            "tubo" if "tubo" in df.columns else None
-        )
-        col_path = "path" if "path" in df.columns else (
-            "arquivo" if "arquivo" in df.columns else None
-        )
 
-        if not (col_wall and col_tube and col_path):
-            return {}
+def _layer_values(inspection, selected_sheet, current, history, layer, min_thickness):
+    others = [open_inspection(entry.hash) for entry in history]
+    years, _, rate = aligned_history(inspection, others, selected_sheet)
+    if layer == LAYER_RATE:
+        finite = rate[np.isfinite(rate)]
+        zmax = max(float(np.percentile(finite, 99)), 0.1) if finite.size else 0.1
+        # Bloco da visão reduzida mostra a MAIOR taxa
+        spec = ("Taxa", "mm/ano", "RdYlGn_r", 0.0, zmax, np.fmax)
+        return rate, years, spec
+    life = remaining_life(current, rate, min_thickness)
+    spec = ("Vida", "anos", "RdYlGn", 0.0, LIFE_CAP_YEARS, np.fmin)
+    return life, years, spec
 
-        if "elevation_m" in df.columns:
-            elev_m = df["elevation_m"].astype(float)
-        elif "elevation_ft" in df.columns:
-            elev_m = df["elevation_ft"].astype(float) / 3.281
-        else:
-            return {}
 
-        wall = df[col_wall].astype(str).str.strip()
-        tube = df[col_tube].astype(str).str.strip()
-        path = df[col_path].astype(str).str.strip()
+@dataclass(frozen=True)
+class _Layer:
+    pyramid: Pyramid
+    years: np.ndarray
+    spec: tuple
 
-        mp = {}
-        for w, t, em, p in zip(wall, tube, elev_m, path):
-            mp[(w, t, round(float(em), 3))] = p
-        return mp
-    except Exception:
-        return {}
+    @property
+    def nbytes(self):
+        return self.pyramid.nbytes
 
 
-def _guess_image_path(base_folder, wall, tube, elev_m):
-    candidates = []
-    for ndec in (3, 2, 1, 0):
-        fmt = f"{{:.{ndec}f}}"
-        em = fmt.format(float(elev_m))
-        candidates += [
-            os.path.join(base_folder, f"{wall}_T{tube}_E{em}.jpg"),
-            os.path.join(base_folder, f"{wall}_T{tube}_E{em}.png"),
-        ]
-    for p in candidates:
-        if os.path.exists(p):
-            return p
-    return None
+def _build_layer(inspection, grid, selected_sheet, current, history, layer, min_thickness):
+    values, years, spec = _layer_values(
+        inspection, selected_sheet, current, history, layer, min_thickness
+    )
+    return _Layer(Pyramid(readonly(values), grid.elevations, grid.tubes, reducer=spec[-1]), years, spec)
 
 
-def create_heatmap(uploaded_file, sheets, image_folder="imgs/fotos", image_map_sheet="Photos"):
-    selected_sheet = st.sidebar.selectbox("Componente:", sheets)
+def _render_layer(inspection, grid, selected_sheet, working_key, current,
+                  history, layer, min_thickness, row_range, col_range):
+    # Camada derivada + pirâmide, compartilhadas entre as sessões
+    layer_key = ("layer", working_key, layer, tuple(e.hash for e in history), min_thickness)
+    cached = cached_derived(layer_key, lambda: _build_layer(
+        inspection, grid, selected_sheet, current, history, layer, min_thickness
+    ))
+    pyramid, years, spec = cached.pyramid, cached.years, cached.spec
+
+    if len(years) < 2:
+        st.info("Nenhuma das inspeções escolhidas contém este componente.")
+        return
+
+    label, unit, colorscale, zmin, zmax, _ = spec
+    values, elevations, tubes, level = pyramid.view(row_range, col_range)
+    fig = build_layer_figure(values, elevations, tubes, label, unit, colorscale, zmin, zmax)
+    st.plotly_chart(fig, use_container_width=True, key=f"layer_{selected_sheet}")
+
+    span = f"{years[0]:+.1f} a {years[-1]:+.1f}".replace(".", ",")
+    st.caption(
+        f"{len(years)} inspeções ({span} anos em relação a esta). "
+        "Taxa pela reta de mínimos quadrados de cada ponto; pontos com menos de "
+        "duas leituras ficam vazios."
+    )
+    if level:
+        st.caption(
+            f"Visão reduzida: cada célula mostra o pior valor de um bloco de "
+            f"{2 ** level}×{2 ** level} pontos."
+        )
 
-    dataframe = pd.read_excel(uploaded_file, selected_sheet)
-    dataframe = dataframe.iloc[3:].reset_index(drop=True)
 
-    # Eixo Y (elevação) em metros
-    first_col = pd.to_numeric(dataframe.iloc[:, 0], errors="coerce")
+def _render_regions(regions, grid):
+    title = (
+        f"Regiões finas: {len(regions)} abaixo de {regions.threshold:.2f} mm"
+    ).replace(".", ",")
+    with st.expander(title, expanded=bool(len(regions))):
+        if not len(regions):
+            st.info("Nenhuma região abaixo do limite.")
+            return
+        frame = regions_frame(regions, grid.elevations, grid.tubes).head(REGIONS_TABLE_ROWS)
+        st.dataframe(
+            frame.rename(columns={
+                "rank": "Região",
+                "cells": "Células",
+                "min_thickness": "Mín. (mm)",
+                "mean_thickness": "Média (mm)",
+                "first_tube": "Do tubo",
+                "last_tube": "Ao tubo",
+                "tube_count": "Tubos",
+                "min_elevation": "Elev. inicial (m)",
+                "max_elevation": "Elev. final (m)",
+            }),
+            hide_index=True,
+            column_config={
+                "Mín. (mm)": st.column_config.NumberColumn(format="%.3f"),
+                "Média (mm)": st.column_config.NumberColumn(format="%.3f"),
+                "Elev. inicial (m)": st.column_config.NumberColumn(format="%.3f"),
+                "Elev. final (m)": st.column_config.NumberColumn(format="%.3f"),
+            },
+        )
+        st.caption(
+            "Células vizinhas (acima, abaixo e dos lados) abaixo do limite formam uma "
+            "região; ordenadas pela menor espessura. O gráfico contorna as "
+            f"{min(len(regions), OUTLINE_MAX_REGIONS)} primeiras."
+        )
 
-    # Define elevação como índice
-    dataframe.set_index(dataframe.columns[0], inplace=True)
 
-    # Leituras em mm
-    dataframe = dataframe.apply(pd.to_numeric, errors="coerce")
+def _cell_wall_tube(grid, selected_sheet, col):
+    # Na visão planificada o rótulo da coluna traz a parede ("parede:tubo")
+    label = str(grid.tubes[col])
+    if selected_sheet == ALL_COMPONENTS:
+        return split_label(label)
+    return selected_sheet, label
+
+
+def _cell_elevation(inspection, grid, selected_sheet, wall, row):
+    # Na visão planificada a linha é uma elevação comum (até alguns cm da
+    # leitura): as fotos usam a elevação real mais próxima na parede
+    elevation = float(grid.elevations[row])
+    if selected_sheet == ALL_COMPONENTS and wall in inspection.sheets:
+        wall_grid = inspection.sheets[wall]
+        nearest = wall_grid.nearest_rows([elevation])[0]
+        if nearest >= 0:
+            elevation = float(wall_grid.elevations[nearest])
+    return elevation
+
+
+def create_heatmap(inspection, sheets, image_folder="imgs/fotos"):
+    options = list(sheets) + [ALL_COMPONENTS] if len(sheets) > 1 else sheets
+    selected_sheet = st.sidebar.selectbox("Componente:", options)
+    if selected_sheet == ALL_COMPONENTS:
+        # Todas as paredes lado a lado (montado só quando escolhido)
+        grid = unwrapped_grid(inspection, sheets)
+    else:
+        grid = inspection.sheets[selected_sheet]
 
     if "reduction_mm" not in st.session_state:
         st.session_state.reduction_mm = 0.0
@@ -95,20 +203,24 @@ def create_heatmap(uploaded_file, sheets, image_folder="imgs/fotos", image_map_s
     if "reduction_percent_on" not in st.session_state:
         st.session_state.reduction_percent_on = False
 
-    factor = (
-        1.0 - (st.session_state.reduction_percent / 100.0)
-        if st.session_state.reduction_percent_on and st.session_state.reduction_percent > 0
-        else 1.0
-    )
-    working_df = dataframe * factor
+    adjustment = Adjustment.from_session(st.session_state)
+    sorted_values = grid.sorted_values
 
-    if st.session_state.reduction_mm_on and st.session_state.reduction_mm > 0:
-        working_df = working_df - st.session_state.reduction_mm
+    # Leituras ajustadas (mm): calculadas só quando o componente ou o ajuste
+    # mudam e compartilhadas entre as sessões (a sessão guarda só as chaves)
+    working_key = (inspection.hash, selected_sheet, adjustment)
+    if adjustment.identity:
+        working = grid.values
+    else:
+        with stage("adjustment"):
+            working = cached_derived(
+                ("adjusted", working_key), lambda: readonly(adjustment.apply(grid.values))
+            )
+    working_df = pd.DataFrame(working, index=grid.elevations, columns=list(grid.tubes), copy=False)
 
     # Sidebar (filtros)
     with st.sidebar:
-        slider_min = float(np.nanmin(working_df.values))
-        slider_max = float(np.nanmax(working_df.values))
+        slider_min, slider_max = adjusted_extent(sorted_values, adjustment)
         if slider_min == slider_max:
             slider_max = slider_min + 1e-6
 
@@ -120,9 +232,9 @@ def create_heatmap(uploaded_file, sheets, image_folder="imgs/fotos", image_map_s
             key="thickness_range",
         )
 
-        condition_percent = (working_df >= min_value) & (working_df <= max_value)
-        dataframe_total = working_df.count().sum()
-        filtered_total = working_df[condition_percent].count().sum()
+        # Contagem pelas leituras ordenadas (busca binária, sem varrer o grid)
+        dataframe_total = sorted_values.size
+        filtered_total = count_in_range(sorted_values, adjustment, min_value, max_value)
         percent_interval = (filtered_total / dataframe_total * 100) if dataframe_total else 0.0
 
         with st.container(border=True):
@@ -180,139 +292,196 @@ def create_heatmap(uploaded_file, sheets, image_folder="imgs/fotos", image_map_s
                  f"{st.session_state.reduction_percent:.1f}%").replace(".", ",")
             )
 
-    # ======== ESCALA DE CORES FIXA ========
-    FIX_MIN = 2.5
-    FIX_MAX = 9.0
-
-    def normalize(v):
-        return (v - FIX_MIN) / (FIX_MAX - FIX_MIN)
+        # Regiões finas (células vizinhas abaixo do limite), sobre as
+        # leituras ajustadas
+        st.markdown("#### Regiões finas")
+        threshold, min_cells = THIN_THRESHOLD_MM, 1
+        regions_on = st.toggle("Destacar regiões finas", key="regions_on")
+        if regions_on:
+            threshold = st.number_input(
+                "Abaixo de (mm):",
+                min_value=0.0,
+                step=0.1,
+                format="%.2f",
+                value=THIN_THRESHOLD_MM,
+                key="regions_threshold",
+            )
+            min_cells = st.number_input(
+                "Área mínima (células):",
+                min_value=1,
+                step=1,
+                value=1,
+                key="regions_min_cells",
+            )
 
-    colorscale = [
-        [normalize(FIX_MIN), "darkred"],
-        [normalize(3.5), "red"],
-        [normalize(3.6), "yellow"],
-        [normalize(4.1), "gold"],
-        [normalize(4.2), "lightgreen"],
-        [normalize(FIX_MAX), "green"],
-    ]
-    # =====================================
-
-    in_range = (working_df >= min_value) & (working_df <= max_value) & (working_df > 0)
-    color_values = working_df.where(in_range, np.nan)
-    mask_black_bool = (working_df <= 0)
-    black_mask = np.where(mask_black_bool, 1, np.nan)
-
-    # X categórico na ordem original
-    cols = working_df.columns.astype(str).tolist()
-
-    fig = go.Figure(data=go.Heatmap(
-        z=color_values,
-        y=first_col,
-        x=cols,
-        zmin=FIX_MIN,
-        zmax=FIX_MAX,
-        colorscale=colorscale,
-        hovertemplate='<b>Tubo:</b> %{x}<br>'
-                      '<b>Elevação:</b> %{y:.3f} m<br>'
-                      '<b>Espessura:</b> %{z:.3f} mm<extra></extra>',
-        hoverongaps=False
-    ))
+        # Histórico da mesma caldeira (inspeções guardadas na biblioteca)
+        layer, history, min_thickness = LAYER_THICKNESS, [], MIN_THICKNESS_MM
+        candidates = [] if selected_sheet == ALL_COMPONENTS else _history_candidates(inspection)
+        if candidates:
+            st.markdown("#### Histórico")
+            history = st.multiselect(
+                "Comparar com inspeções anteriores:",
+                candidates,
+                format_func=lambda entry: entry.label(),
+                key="history_entries",
+            )
+            if history:
+                layer = st.selectbox("Camada:", LAYERS, key="history_layer")
+                if layer == LAYER_LIFE:
+                    min_thickness = st.number_input(
+                        "Espessura mínima (mm):",
+                        min_value=0.0,
+                        step=0.1,
+                        format="%.2f",
+                        value=MIN_THICKNESS_MM,
+                        key="history_min_thickness",
+                    )
+
+        # Grids grandes: visão geral reduzida + janela em resolução total
+        row_range = col_range = None
+        if grid.values.size > LOD_MAX_CELLS:
+            st.markdown("#### Janela de visualização")
+            elev_min = float(grid.elevations.min())
+            elev_max = float(grid.elevations.max())
+            elevation_range = st.slider(
+                "Elevação (m):",
+                min_value=elev_min,
+                max_value=elev_max,
+                value=(elev_min, elev_max),
+                key=f"lod_elevation_{selected_sheet}",
+            )
+            tube_range = st.select_slider(
+                "Tubos:",
+                options=range(len(grid.tubes)),
+                value=(0, len(grid.tubes) - 1),
+                format_func=lambda i: grid.tubes[i],
+                key=f"lod_tubes_{selected_sheet}",
+            )
+            row_range, col_range = index_window(grid.elevations, elevation_range, tube_range)
 
-    fig.add_trace(go.Heatmap(
-        z=black_mask,
-        y=first_col,
-        x=cols,
-        colorscale=[[0, "black"], [1, "black"]],
-        zmin=0,
-        zmax=1,
-        showscale=False,
-        hovertemplate=(
-            "<b>Tubo:</b> %{x}<br>"
-            "<b>Elevação:</b> %{y:.3f} m<br>"
-            "<b>Espessura:</b> %{customdata:.3f} mm"
-            "<extra></extra>"
-        ),
-        customdata=working_df.values,
-        hoverongaps=False,
-        opacity=1.0
-    ))
+    if layer != LAYER_THICKNESS:
+        with stage("layer"):
+            _render_layer(
+                inspection, grid, selected_sheet, working_key, working_df.values,
+                history, layer, min_thickness, row_range, col_range,
+            )
+        return working_df
 
-    # ---- ticks do eixo X: marcar de 5 em 5 colunas ----
-    tick_idx = list(range(0, len(cols), 5))
-    if cols and (len(cols) - 1) not in tick_idx:
-        tick_idx.append(len(cols) - 1)
-    x_tickvals = [cols[i] for i in tick_idx]
-    x_ticktext = x_tickvals
-    # ---------------------------------------------------
-
-    # ---- eixo Y: marcar de 2 em 2 m (dtick) ----
-    y_vals = first_col.values
-    if np.isfinite(y_vals).any():
-        y_min = float(np.nanmin(y_vals))
-        y_max = float(np.nanmax(y_vals))
+    if row_range is None:
+        values, elevations, tubes, level = working, grid.elevations, grid.tubes, 0
     else:
-        y_min, y_max = 0.0, 0.0
-
-    y_tick0 = 2.0 * np.floor(min(y_min, y_max) / 2.0)
-    # ---------------------------------------------------
-
-    fig.update_layout(
-        hovermode="closest",
-        yaxis=dict(
-            title="Elevação",
-            type="linear",
-            tickmode="linear",
-            tick0=y_tick0,
-            dtick=2.0,
-            tickformat=".0f",
-            ticksuffix=" m",
-        ),
-        xaxis=dict(
-            title="Tubos",
-            type="category",
-            categoryorder="array",
-            categoryarray=cols,
-            tickmode="array",
-            tickvals=x_tickvals,
-            ticktext=x_ticktext,
-            automargin=True,
-        ),
-    )
+        pyramid = cached_derived(
+            ("pyramid", working_key), lambda: Pyramid(working, grid.elevations, grid.tubes)
+        )
+        values, elevations, tubes, level = pyramid.view(row_range, col_range)
+
+    regions, shapes = None, ()
+    if regions_on:
+        with stage("regions") as info:
+            regions = cached_derived(
+                ("regions", working_key, threshold, min_cells),
+                lambda: find_regions(working, threshold, min_cells),
+            )
+            info["regions"] = len(regions)
+        shapes = region_shapes(regions, grid.elevations, row_range, col_range, level)
+
+    # Só o z filtrado (float32, somente leitura) é guardado, no cache
+    # compartilhado; o gráfico é montado a cada rerun e não fica na sessão
+    figure_key = (working_key, row_range, col_range)
+    with stage("figure"):
+        z = cached_derived(
+            ("heatmap_z", *figure_key, min_value, max_value),
+            lambda: readonly(heatmap_z(values, min_value, max_value)),
+        )
+        fig = build_heatmap_figure(
+            values, elevations, tubes, min_value, max_value, shapes, z=z
+        )
 
-    st.plotly_chart(fig, use_container_width=True)
+    # Seleção de pontos só em resolução total (na visão reduzida cada
+    # célula é um bloco)
+    with stage("plotly_chart") as info:
+        event = st.plotly_chart(
+            fig,
+            use_container_width=True,
+            on_select="rerun" if level == 0 else "ignore",
+            selection_mode=("points", "box", "lasso"),
+            key=f"heatmap_{selected_sheet}",
+        )
+    # Registrado na etapa, mas calculado fora da medição do tempo
+    if "payload_sizes" not in st.session_state:
+        st.session_state.payload_sizes = PayloadSizes()
+    info["payload_bytes"] = st.session_state.payload_sizes.get((figure_key, str(shapes)), fig)
+    if level:
+        st.caption(
+            f"Visão reduzida: cada célula mostra a menor leitura de um bloco de "
+            f"{2 ** level}×{2 ** level} leituras. Reduza a janela para ver em resolução total."
+        )
+    st.caption(f"Gráfico: {info['payload_bytes'] / 1024:.0f} kB".replace(".", ","))
 
-    if (working_df <= 0).any().any():
+    if count_in_range(sorted_values, adjustment, high=0.0) > 0:
         st.warning("Algumas leituras ficaram ≤ 0 mm após os ajustes. Elas estão destacadas em preto.")
 
-    if "image_map_cache" not in st.session_state:
-        st.session_state.image_map_cache = _build_image_map(uploaded_file, sheet_name=image_map_sheet)
-
-    # if selected:
-    #     pt = selected[0]
-    #     tube_clicked = str(pt.get("x"))
-    #     elev_clicked_m = float(pt.get("y"))
-
-    #     idx_nearest = (first_col - elev_clicked_m).abs().idxmin()
-    #     elev_row_m = float(first_col.iloc[idx_nearest])
-
-    #     img_path = None
-    #     mp = st.session_state.image_map_cache or {}
-    #     k = (str(selected_sheet), tube_clicked, round(elev_row_m, 3))
-    #     if k in mp:
-    #         img_path = mp[k]
-    #     else:
-    #         img_path = _guess_image_path(image_folder, str(selected_sheet), tube_clicked, elev_row_m)
-
-    #     st.markdown(
-    #         f"**Ponto selecionado** → Parede: `{selected_sheet}` • Tubo: `#{tube_clicked}` • Elevação: `{elev_row_m:.3f} m`"
-    #         .replace(".", ",")
-    #     )
-    #     if img_path and os.path.exists(img_path):
-    #         st.image(img_path, caption=f"{selected_sheet} — Tubo #{tube_clicked} — {elev_row_m:.3f} m")
-    #     else:
-    #         st.info("Nenhuma imagem encontrada para este ponto. "
-    #                 "Você pode adicionar uma planilha `Photos` ao Excel (wall, tube, elevation_m, path) "
-    #                 f"ou salvar as imagens em `{image_folder}` usando o padrão "
-    #                 "`{WALL}_T{TUBO}_E{ELEV}.jpg|png` (em m).")
-
-    return working_df
\ No newline at end of file
+    if regions is not None:
+        _render_regions(regions, grid)
+
+    selection = event.get("selection") if level == 0 and event else None
+    if not selection:
+        return working_df
+
+    rows, cols = selection_cells(grid, selection, row_range, col_range)
+
+    photo_map = get_photo_map(inspection)
+    if photo_map.error:
+        st.warning(photo_map.error)
+    if rows.size == 1:
+        wall, tube_clicked = _cell_wall_tube(grid, selected_sheet, cols[0])
+        elev_row_m = _cell_elevation(inspection, grid, selected_sheet, wall, rows[0])
+
+        img_path = _photo_path(photo_map, image_folder, wall, tube_clicked, elev_row_m) if wall else None
+
+        st.markdown(
+            f"**Ponto selecionado** → Parede: `{wall}` • Tubo: `#{tube_clicked}` • Elevação: `{elev_row_m:.3f} m`"
+            .replace(".", ",")
+        )
+        if img_path and os.path.exists(img_path):
+            caption = f"{wall} — Tubo #{tube_clicked} — {elev_row_m:.3f} m"
+            try:
+                st.image(get_thumbnail(img_path), caption=caption)
+            except OSError:
+                st.image(img_path, caption=caption)
+            if st.toggle("Ver imagem original", key="photo_full_size"):
+                st.image(img_path, caption=caption)
+
+            # Prepara as fotos dos vizinhos (tubos e elevações adjacentes)
+            r, c = int(rows[0]), int(cols[0])
+            neighbors = [
+                (_cell_wall_tube(grid, selected_sheet, nc), nr)
+                for nr, nc in ((r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1))
+                if 0 <= nr < len(grid.elevations) and 0 <= nc < len(grid.tubes)
+            ]
+            prefetch(
+                _photo_path(
+                    photo_map, image_folder, n_wall, n_tube,
+                    _cell_elevation(inspection, grid, selected_sheet, n_wall, nr),
+                )
+                for (n_wall, n_tube), nr in neighbors
+                if n_wall
+            )
+        else:
+            st.info("Nenhuma imagem encontrada para este ponto. "
+                    "Você pode adicionar uma planilha `Photos` ao Excel (wall, tube, elevation_m, path) "
+                    f"ou salvar as imagens em `{image_folder}` usando o padrão "
+                    "`{WALL}_T{TUBO}_E{ELEV}.jpg|png` (em m).")
+    elif rows.size > 1:
+        cells = cells_frame(grid, working_df.values, rows, cols)
+        st.markdown(
+            f"**{len(cells)} células selecionadas** • menor espessura: "
+            f"`{cells['thickness'].min():.3f} mm`".replace(".", ",")
+        )
+        st.dataframe(
+            cells.nsmallest(SELECTION_TABLE_ROWS, "thickness")[["tube", "elevation", "thickness"]]
+            .rename(columns={"tube": "Tubo", "elevation": "Elevação (m)", "thickness": "Espessura (mm)"}),
+            hide_index=True,
+        )
+
+    return working_df